@@ -0,0 +1,57 @@
+from database import db
+from snapshots import VersionedSnapshot
+
+# ✅ 시장 전체 지표별 연도 평균을 $group 한 번으로 계산 (여러 지표 동시)
+# 업종별 평균은 industry_stats 의 미리 집계된 문서를 사용
+SOURCE_COLLECTION = "finacial_statement"
+
+# ✅ (지표, 자릿수) → 결과 캐시. 원본 버전이 바뀌거나 TTL 이 지나면 비워짐
+_cache = VersionedSnapshot("averages", (SOURCE_COLLECTION,), dict)
+
+
+def _numeric(field):
+    value = f"${field}"
+    # ✅ 유한한 숫자만 평균에 포함 (NaN 은 -inf 보다 작게 비교됨, $avg 는 null 을 건너뜀)
+    return {
+        "$cond": [
+            {"$and": [
+                {"$isNumber": value},
+                {"$gt": [value, float("-inf")]},
+                {"$lt": [value, float("inf")]},
+            ]},
+            value,
+            None,
+        ]
+    }
+
+
+def build_pipeline(fields):
+    match = {"연도": {"$ne": None}}
+    group = {"_id": "$연도"}
+    for i, field in enumerate(fields):
+        group[f"m{i}"] = {"$avg": _numeric(field)}
+
+    return [
+        {"$match": match},
+        {"$project": {"_id": 0, "연도": 1, **{f: 1 for f in fields}}},
+        {"$group": group},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def yearly_averages(fields, digits=2):
+    fields = tuple(fields)
+    key = (fields, digits)
+    cache = _cache.get()
+    if key in cache:
+        return cache[key]
+
+    result = {field: [] for field in fields}
+    for row in db[SOURCE_COLLECTION].aggregate(build_pipeline(fields)):
+        for i, field in enumerate(fields):
+            avg = row.get(f"m{i}")
+            if avg is not None:
+                result[field].append({"year": row["_id"], "average": round(avg, digits)})
+
+    cache[key] = result
+    return result
@@ -0,0 +1,30 @@
+from database import async_db
+
+
+# ✅ 한 회사의 여러 컬렉션 데이터를 $unionWith 파이프라인 1번(왕복 1회)으로 조회
+async def fetch_company_rows(company_name, collections):
+    def source_stages(collection_name):
+        return [
+            {"$match": {"회사명": company_name}},
+            {"$project": {"_id": 0}},
+            {"$addFields": {"_source": collection_name}},
+        ]
+
+    first, *rest = collections
+    pipeline = source_stages(first) + [
+        {"$unionWith": {"coll": name, "pipeline": source_stages(name)}}
+        for name in rest
+    ]
+
+    rows = {name: [] for name in collections}
+    async for row in async_db[first].aggregate(pipeline):
+        rows[row.pop("_source")].append(row)
+    return rows
+
+
+# ✅ 연도별 첫 문서만 사용 (기존 find_one 과 동일)
+def rows_by_year(rows):
+    by_year = {}
+    for row in rows:
+        by_year.setdefault(row.get("연도"), row)
+    return by_year
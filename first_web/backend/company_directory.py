@@ -0,0 +1,70 @@
+import time
+
+from database import db
+from snapshots import VersionedSnapshot
+
+# ✅ 미등록 회사 조회 시 재적재 최소 간격(초)
+MISS_RELOAD_SECONDS = 30
+EMPTY = ({}, {})
+
+
+# ✅ 회사 → GICS 코드, 업종명, 티커, 동종업계 목록을 메모리에 보관
+class CompanyDirectory:
+    def __init__(self):
+        self._tickers = {}
+        self._miss_reload_at = 0.0
+        # 갱신 정책(TTL·버전 확인)은 다른 스냅샷과 동일하게 VersionedSnapshot 에 맡김
+        self._snapshot = VersionedSnapshot("company_directory", ("category",), self._build)
+
+    def set_tickers(self, ticker_map):
+        self._tickers = dict(ticker_map)
+        profiles, _ = self._snapshot.peek() or EMPTY
+        for name, profile in profiles.items():
+            profile["ticker"] = self._tickers.get(name)
+
+    def _build(self):
+        peers = {}
+        profiles = {}
+        for doc in db.category.find({"GICS_4자리": {"$exists": True}}, {"_id": 0, "종목명": 1, "GICS_4자리": 1, "업종명": 1}):
+            name = doc.get("종목명")
+            if not name or name in profiles:
+                continue
+            gics_code = doc["GICS_4자리"]
+            peers.setdefault(gics_code, []).append(name)
+            profiles[name] = {
+                "종목명": name,
+                "GICS_4자리": gics_code,
+                "업종명": doc.get("업종명"),
+                "ticker": self._tickers.get(name),
+            }
+
+        for profile in profiles.values():
+            profile["peers"] = peers[profile["GICS_4자리"]]
+
+        print(f"✅ [company_directory] {len(profiles)}개 회사 / {len(peers)}개 업종 적재")
+        return profiles, peers
+
+    def load(self):
+        return self._snapshot.rebuild()
+
+    # ✅ 조회는 DB 를 기다리지 않음: TTL·버전 확인과 재적재는 백그라운드 스레드에서
+    def _current(self):
+        return self._snapshot.get_nowait() or EMPTY
+
+    def get(self, company_name):
+        profile = self._current()[0].get(company_name)
+        now = time.monotonic()
+        if profile is None and now - self._miss_reload_at >= MISS_RELOAD_SECONDS:
+            # ✅ 새로 추가된 회사일 수 있으므로 재적재 예약 (간격당 한 번만)
+            self._miss_reload_at = now
+            self._snapshot.refresh_in_background(force=True)
+        return profile
+
+    def industries(self, wait=False):
+        # wait=True: 스냅샷 빌드처럼 백그라운드 스레드에서 부를 때 (아직 적재 전이면 적재될 때까지 기다림)
+        if wait:
+            return self._snapshot.get()[1]
+        return self._current()[1]
+
+
+directory = CompanyDirectory()
@@ -1,6 +1,74 @@
 from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+from motor.motor_asyncio import AsyncIOMotorClient
+from collections import Counter
 import os
+import threading
+import time
 
 MONGO_URI = os.getenv("MONGO_URI", "")
-client = MongoClient(MONGO_URI)
-db = client["project1"]
\ No newline at end of file
+MONGO_DB = os.getenv("MONGO_DB", "project1")
+
+# ✅ 커넥션 풀 / 타임아웃 설정 (환경변수로 조정)
+POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+}
+
+# ✅ 요청 처리용 비동기 클라이언트 (핸들러에서 await)
+async_client = AsyncIOMotorClient(MONGO_URI, **POOL_OPTIONS)
+async_db = async_client[MONGO_DB]
+
+# ✅ 백그라운드 스레드(스냅샷·업종 통계 재계산)와 CLI 용 동기 클라이언트 (작은 풀)
+client = MongoClient(MONGO_URI, **{
+    **POOL_OPTIONS,
+    "maxPoolSize": int(os.getenv("MONGO_SYNC_MAX_POOL_SIZE", "10")),
+    "minPoolSize": 0,
+})
+db = client[MONGO_DB]
+
+
+# ✅ 서버 시작 시 연결 미리 열기 (첫 요청 지연 방지)
+async def warm_up():
+    await async_client.admin.command("ping")
+
+
+def close():
+    async_client.close()
+    client.close()
+
+
+# ✅ 컬렉션별 변경 횟수 (change stream 으로 집계 → 문서 수가 같은 수정·교체도 감지)
+CHANGE_WATCH_RETRY_SECONDS = 30
+_change_counts = Counter()
+
+
+def _watch_changes():
+    while True:
+        try:
+            with db.watch([{"$project": {"ns": 1}}], max_await_time_ms=1000) as stream:
+                for change in stream:
+                    _change_counts[change["ns"]["coll"]] += 1
+        except OperationFailure as e:
+            # ✅ 단일 mongod 등 change stream 미지원: 버전은 문서 수만 반영되고 스냅샷은 TTL 로 갱신
+            print(f"⚠️ [database] 변경 감지 불가 → 스냅샷은 문서 수 변화·TTL 로만 갱신: {e}")
+            return
+        except PyMongoError as e:
+            print(f"⚠️ [database] 변경 감지 재연결 대기: {e}")
+        time.sleep(CHANGE_WATCH_RETRY_SECONDS)
+
+
+def start_change_watch():
+    thread = threading.Thread(target=_watch_changes, name="collection-changes", daemon=True)
+    thread.start()
+    return thread
+
+
+# ✅ 데이터 변경 감지용 저비용 버전 (컬렉션별 문서 수 + 변경 횟수)
+def collection_version(*names):
+    return tuple((db[name].estimated_document_count(), _change_counts[name]) for name in names)
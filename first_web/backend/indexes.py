@@ -0,0 +1,107 @@
+import sys
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from database import db
+
+# ✅ 회사명(+연도)로 조회하는 컬렉션
+COMPANY_YEAR_COLLECTIONS = [
+    "finacial_statement", "ESG_rate", "director_ratio", "share_holder_ratio",
+    "environment_ratio", "environment_sales", "Sharp", "stock_price",
+]
+
+# ✅ 컬렉션 → 필요한 인덱스 (서버 시작 시 보장)
+INDEX_SPECS = {
+    **{
+        name: [IndexModel([("회사명", ASCENDING), ("연도", ASCENDING)], name="회사명_연도")]
+        for name in COMPANY_YEAR_COLLECTIONS
+    },
+    "category": [
+        IndexModel([("종목명", ASCENDING)], name="종목명"),
+        IndexModel([("GICS_4자리", ASCENDING), ("종목명", ASCENDING)], name="GICS_4자리_종목명"),
+    ],
+    "users": [IndexModel([("email", ASCENDING)], name="email")],
+}
+
+
+def ensure_indexes():
+    created = []
+    for collection_name, models in INDEX_SPECS.items():
+        try:
+            created += db[collection_name].create_indexes(models)
+        except PyMongoError as e:
+            print(f"⚠️ [indexes] {collection_name} 인덱스 생성 실패: {e}")
+    print(f"✅ [indexes] {len(created)}개 인덱스 확인")
+    return created
+
+
+# ✅ 엔드포인트별 조회 형태 (전체 스냅샷을 만드는 스캔은 의도된 COLLSCAN 이라 제외)
+def query_shapes(company_name, gics_code):
+    shapes = [
+        ("/company/{name}/financials", "finacial_statement", {"회사명": company_name}),
+        ("/company/{name}/sharp", "Sharp", {"회사명": company_name}),
+        ("/company/{name}/stock", "stock_price", {"회사명": company_name}),
+        ("/stocks/batch", "stock_price", {"회사명": {"$in": [company_name]}}),
+        ("industry_stats.refresh_for_companies", "category", {"종목명": {"$in": [company_name]}}),
+        ("industry_stats.refresh_industries", "category", {"GICS_4자리": {"$in": [gics_code]}}),
+        ("/login, /favorites", "users", {"email": "user@example.com"}),
+    ]
+    # ✅ /nonfinancials, /analysis 의 $unionWith 각 단계
+    shapes += [
+        ("company_data.fetch_company_rows", name, {"회사명": company_name})
+        for name in COMPANY_YEAR_COLLECTIONS if name not in ("Sharp", "stock_price")
+    ]
+    return shapes
+
+
+def _plan_stages(node):
+    stages = []
+    if isinstance(node, dict):
+        if "stage" in node:
+            stages.append(node["stage"])
+        for value in node.values():
+            stages += _plan_stages(value)
+    elif isinstance(node, list):
+        for value in node:
+            stages += _plan_stages(value)
+    return stages
+
+
+def explain_query_shapes(company_name=None):
+    sample = db.category.find_one(
+        {"종목명": company_name} if company_name else {"GICS_4자리": {"$exists": True}},
+        {"_id": 0, "종목명": 1, "GICS_4자리": 1},
+    ) or {}
+    company_name = sample.get("종목명", company_name or "")
+    gics_code = sample.get("GICS_4자리", "")
+
+    report = []
+    for endpoint, collection_name, query in query_shapes(company_name, gics_code):
+        try:
+            plan = db[collection_name].find(query).explain()
+            stages = _plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+            error = None
+        except PyMongoError as e:
+            stages, error = [], str(e)
+        report.append({
+            "endpoint": endpoint,
+            "collection": collection_name,
+            "filter": str(query),
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "error": error,
+        })
+    return report
+
+
+if __name__ == "__main__":
+    # python indexes.py          → 인덱스 생성
+    # python indexes.py --check  → 조회 형태 explain, COLLSCAN 있으면 종료 코드 1
+    if "--check" in sys.argv:
+        report = explain_query_shapes()
+        for row in report:
+            mark = "❌" if row["collscan"] or row["error"] else "✅"
+            print(f"{mark} {row['collection']:<20} {row['endpoint']:<40} {' > '.join(row['stages']) or row['error']}")
+        sys.exit(1 if any(row["collscan"] or row["error"] for row in report) else 0)
+    ensure_indexes()
@@ -0,0 +1,162 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ✅ 지표 이름 → 기본 파라미터 (drawdown 은 파라미터 없음)
+DEFAULT_PARAMS = {"sma": 20, "ema": 20, "volatility": 20, "rsi": 14, "drawdown": None}
+MAX_WINDOW = 500
+TRADING_DAYS = 252
+CACHE_SIZE = 1024
+
+
+def parse_specs(text):
+    # "sma:20,ema:60,rsi,drawdown" → [("sma", 20), ("ema", 60), ("rsi", 14), ("drawdown", None)]
+    specs = []
+    for token in text.split(","):
+        token = token.strip().lower()
+        if not token:
+            continue
+        name, _, param = token.partition(":")
+        if name not in DEFAULT_PARAMS:
+            raise ValueError(f"지원하지 않는 지표: {name}")
+        if DEFAULT_PARAMS[name] is None:
+            specs.append((name, None))
+            continue
+        try:
+            value = int(param) if param else DEFAULT_PARAMS[name]
+        except ValueError:
+            raise ValueError(f"{name} 기간은 숫자여야 합니다")
+        if not 2 <= value <= MAX_WINDOW:
+            raise ValueError(f"{name} 기간은 2~{MAX_WINDOW} 사이여야 합니다")
+        specs.append((name, value))
+    return list(dict.fromkeys(specs))
+
+
+def spec_key(name, param):
+    return name if param is None else f"{name}:{param}"
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+# ✅ 각 지표: closes[start:] 구간 값만 계산 (start 이전 값은 prev 배열 재사용)
+#    → (실제 계산 시작 위치, {배열 이름: 값})
+def _sma(closes, window, start, prev):
+    lo = max(0, start - window + 1)
+    part = closes[lo:]
+    values = _nan(len(part))
+    if len(part) >= window:
+        values[window - 1:] = sliding_window_view(part, window).mean(axis=1)
+    return start, {"value": values[start - lo:]}
+
+
+def _volatility(closes, window, start, prev):
+    # ✅ 로그수익률 이동 표준편차 (연율화)
+    lo = max(0, start - window)
+    part = closes[lo:]
+    returns = np.r_[np.nan, np.log(part[1:] / part[:-1])]
+    values = _nan(len(part))
+    if len(part) > window:
+        values[window:] = sliding_window_view(returns[1:], window).std(axis=1, ddof=1) * math.sqrt(TRADING_DAYS)
+    return start, {"value": values[start - lo:]}
+
+
+def _ema(closes, span, start, prev):
+    alpha = 2 / (span + 1)
+    values = _nan(len(closes) - start)
+    last = prev["value"][start - 1] if start > 0 else closes[0]
+    for i, close in enumerate(closes[start:]):
+        last = close if start + i == 0 else alpha * close + (1 - alpha) * last
+        values[i] = last
+    return start, {"value": values}
+
+
+def _rsi(closes, period, start, prev):
+    # ✅ Wilder 평활 RSI (평균 상승/하락폭을 보조 배열로 보관해 이어서 계산)
+    if start <= period:
+        start = 0
+    n = len(closes)
+    gains, losses, values = _nan(n - start), _nan(n - start), _nan(n - start)
+    if n <= period:
+        return start, {"value": values, "gain": gains, "loss": losses}
+
+    deltas = np.diff(closes)
+    if start == 0:
+        avg_gain = np.clip(deltas[:period], 0, None).mean()
+        avg_loss = np.clip(-deltas[:period], 0, None).mean()
+        first = period
+    else:
+        avg_gain, avg_loss = prev["gain"][start - 1], prev["loss"][start - 1]
+        first = start
+
+    for i in range(first, n):
+        if i > period:
+            delta = deltas[i - 1]
+            avg_gain = (avg_gain * (period - 1) + max(delta, 0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-delta, 0)) / period
+        gains[i - start], losses[i - start] = avg_gain, avg_loss
+        values[i - start] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+    return start, {"value": values, "gain": gains, "loss": losses}
+
+
+def _drawdown(closes, _, start, prev):
+    previous_peak = prev["peak"][start - 1] if start > 0 else -np.inf
+    peaks = np.maximum.accumulate(np.r_[previous_peak, closes[start:]])[1:]
+    return start, {"value": closes[start:] / peaks - 1, "peak": peaks}
+
+
+CALCULATORS = {"sma": _sma, "ema": _ema, "volatility": _volatility, "rsi": _rsi, "drawdown": _drawdown}
+
+
+# ✅ (티커, 지표, 파라미터) → 전체 기간 계산 결과. 마지막 봉이 같으면 재사용,
+#    새 봉이 붙었거나 마지막 봉이 고쳐졌으면 그 지점부터만 이어서 계산
+class IndicatorCache:
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def series(self, symbol, name, param, dates, closes):
+        key = (symbol, name, param)
+        entry = self._lookup(key)
+        n = len(closes)
+
+        if entry is not None and entry["rows"] == n and entry["last_date"] == dates[-1] and entry["last_close"] == closes[-1]:
+            return entry["arrays"]["value"]
+
+        # ✅ 캐시된 마지막 봉 위치부터 다시 계산 (장중에 덮어쓴 마지막 봉 포함)
+        start = 0
+        if entry is not None:
+            k = entry["rows"] - 1
+            if 0 < k < n and dates[k] == entry["last_date"]:
+                start = k
+
+        prev = entry["arrays"] if start > 0 else None
+        start, tail = CALCULATORS[name](closes, param, start, prev)
+        arrays = {
+            field: np.concatenate([prev[field][:start], values]) if start > 0 else values
+            for field, values in tail.items()
+        }
+
+        self._store(key, {"rows": n, "last_date": dates[-1], "last_close": closes[-1], "arrays": arrays})
+        return arrays["value"]
+
+
+indicator_cache = IndicatorCache()
@@ -0,0 +1,255 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from pymongo import ReplaceOne
+from pymongo.errors import OperationFailure, PyMongoError
+
+from database import db, async_db
+
+# ✅ 업종(GICS_4자리) × 연도 × 지표 → avg/count/min/max 를 미리 계산해 두는 컬렉션
+STATS_COLLECTION = "industry_stats"
+
+GRADE_MAP = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
+
+# ✅ 집계 대상 컬렉션 → 필드 목록
+SOURCE_FIELDS = {
+    "director_ratio": ["여성이사 비율", "사외이사 비율(%)"],
+    "share_holder_ratio": ["최대주주지분율"],
+    "ESG_rate": ["종합등급", "환경", "사회", "지배구조"],
+    "environment_ratio": ["환경투자비율"],
+    "environment_sales": ["매출단위당_온실가스배출량", "매출단위당_에너지사용량"],
+    "finacial_statement": [
+        "부채비율", "ROE(%)", "ROA(%)", "자산총계", "영업이익", "영업이익률", "순이익률",
+        "자본유보율", "자기자본비율", "매출액증가율", "이익증가율", "자산증가율", "FCF", "EPS(기본)",
+    ],
+}
+
+# ✅ 변경 감지 후 재계산까지 모아두는 시간(초)
+WATCH_DEBOUNCE_SECONDS = 5
+# ✅ 변경 감지(change stream)를 쓸 수 없을 때 전체 재계산 주기(초)
+REFRESH_INTERVAL_SECONDS = int(os.getenv("INDUSTRY_STATS_REFRESH_SECONDS", "600"))
+# ✅ 일시적 오류로 변경 감지가 끊겼을 때 재연결 대기(초)
+WATCH_RETRY_SECONDS = 30
+
+
+def _to_number(collection_name, value):
+    if collection_name == "ESG_rate":
+        return GRADE_MAP.get(value)
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(v) or math.isinf(v):
+        return None
+    return v
+
+
+def _to_year(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_industries(gics_codes=None):
+    query = {"GICS_4자리": {"$exists": True}}
+    if gics_codes is not None:
+        query["GICS_4자리"] = {"$in": list(gics_codes)}
+
+    industries = {}
+    for doc in db.category.find(query, {"_id": 0, "종목명": 1, "GICS_4자리": 1, "업종명": 1}):
+        gics_code = doc["GICS_4자리"]
+        entry = industries.setdefault(gics_code, {"업종명": doc.get("업종명"), "companies": []})
+        if entry["업종명"] is None:
+            entry["업종명"] = doc.get("업종명")
+        if doc.get("종목명"):
+            entry["companies"].append(doc["종목명"])
+    return industries
+
+
+def build_industry_docs(gics_codes=None):
+    industries = _load_industries(gics_codes)
+    company_to_gics = {
+        name: gics_code
+        for gics_code, entry in industries.items()
+        for name in entry["companies"]
+    }
+    if not company_to_gics:
+        return {}
+
+    # ✅ (업종, 컬렉션, 필드, 연도) → [count, sum, min, max]
+    acc = defaultdict(lambda: [0, 0.0, math.inf, -math.inf])
+
+    for collection_name, fields in SOURCE_FIELDS.items():
+        query = {} if gics_codes is None else {"회사명": {"$in": list(company_to_gics)}}
+        projection = {"_id": 0, "회사명": 1, "연도": 1, **{f: 1 for f in fields}}
+
+        for row in db[collection_name].find(query, projection):
+            gics_code = company_to_gics.get(row.get("회사명"))
+            year = _to_year(row.get("연도"))
+            if gics_code is None or year is None:
+                continue
+            for field in fields:
+                v = _to_number(collection_name, row.get(field))
+                if v is None:
+                    continue
+                bucket = acc[(gics_code, collection_name, field, year)]
+                bucket[0] += 1
+                bucket[1] += v
+                bucket[2] = min(bucket[2], v)
+                bucket[3] = max(bucket[3], v)
+
+    now = datetime.utcnow()
+    docs = {
+        gics_code: {
+            "_id": gics_code,
+            "GICS_4자리": gics_code,
+            "업종명": entry["업종명"],
+            "companies": entry["companies"],
+            "stats": {},
+            "updated_at": now,
+        }
+        for gics_code, entry in industries.items()
+    }
+    for (gics_code, collection_name, field, year), (count, total, lo, hi) in acc.items():
+        stats = docs[gics_code]["stats"].setdefault(collection_name, {}).setdefault(field, {})
+        stats[str(year)] = {"avg": total / count, "count": count, "min": lo, "max": hi}
+
+    return docs
+
+
+def refresh_industry_stats():
+    started = time.monotonic()
+    docs = build_industry_docs()
+    collection = db[STATS_COLLECTION]
+
+    if docs:
+        collection.bulk_write([ReplaceOne({"_id": k}, v, upsert=True) for k, v in docs.items()])
+    collection.delete_many({"_id": {"$nin": list(docs)}})
+
+    print(f"✅ [industry_stats] {len(docs)}개 업종 갱신 ({time.monotonic() - started:.2f}s)")
+    return len(docs)
+
+
+def refresh_industries(gics_codes):
+    gics_codes = [g for g in set(gics_codes) if g is not None]
+    if not gics_codes:
+        return {}
+
+    docs = build_industry_docs(gics_codes)
+    collection = db[STATS_COLLECTION]
+    if docs:
+        collection.bulk_write([ReplaceOne({"_id": k}, v, upsert=True) for k, v in docs.items()])
+    missing = [g for g in gics_codes if g not in docs]
+    if missing:
+        collection.delete_many({"_id": {"$in": missing}})
+    return docs
+
+
+def refresh_for_companies(company_names):
+    cursor = db.category.find({"종목명": {"$in": list(company_names)}}, {"_id": 0, "GICS_4자리": 1})
+    return refresh_industries(doc.get("GICS_4자리") for doc in cursor)
+
+
+def get_industry_stats(gics_code):
+    doc = db[STATS_COLLECTION].find_one({"_id": gics_code})
+    if doc is None:
+        # ✅ 아직 집계되지 않은 업종이면 해당 업종만 즉시 계산
+        doc = refresh_industries([gics_code]).get(gics_code)
+    return doc
+
+
+async def get_industry_stats_async(gics_code):
+    doc = await async_db[STATS_COLLECTION].find_one({"_id": gics_code})
+    if doc is None:
+        doc = (await asyncio.to_thread(refresh_industries, [gics_code])).get(gics_code)
+    return doc
+
+
+def metric_stats(stats_doc, collection_name, field):
+    by_year = ((stats_doc or {}).get("stats", {}).get(collection_name, {}).get(field, {}))
+    return {int(year): values for year, values in by_year.items()}
+
+
+def metric_averages(stats_doc, collection_name, field, digits):
+    return {
+        year: round(values["avg"], digits)
+        for year, values in metric_stats(stats_doc, collection_name, field).items()
+    }
+
+
+# ✅ 원본 컬렉션 변경 감지 → 해당 업종만 증분 재계산
+def _flush_changes(dirty_companies, full_refresh):
+    try:
+        if full_refresh:
+            refresh_industry_stats()
+        elif dirty_companies:
+            docs = refresh_for_companies(dirty_companies)
+            print(f"✅ [industry_stats] 변경 반영: {len(docs)}개 업종")
+    except PyMongoError as e:
+        print(f"⚠️ [industry_stats] 재계산 실패: {e}")
+
+
+def _watch_loop():
+    watched = list(SOURCE_FIELDS) + ["category"]
+    pipeline = [{"$match": {"ns.coll": {"$in": watched}}}]
+    while True:
+        try:
+            with db.watch(pipeline, full_document="updateLookup", max_await_time_ms=1000) as stream:
+                dirty, full_refresh = set(), False
+                last_flush = time.monotonic()
+                while stream.alive:
+                    change = stream.try_next()
+                    if change is not None:
+                        doc = change.get("fullDocument") or {}
+                        if change["ns"]["coll"] == "category" or "회사명" not in doc:
+                            # ✅ 업종 매핑 변경·삭제는 어느 업종인지 알 수 없으므로 전체 재계산
+                            full_refresh = True
+                        else:
+                            dirty.add(doc["회사명"])
+
+                    if (dirty or full_refresh) and time.monotonic() - last_flush >= WATCH_DEBOUNCE_SECONDS:
+                        _flush_changes(dirty, full_refresh)
+                        dirty, full_refresh = set(), False
+                        last_flush = time.monotonic()
+        except OperationFailure as e:
+            # ✅ change stream 미지원(단일 mongod 등)일 때만 주기적 재계산으로 전환
+            print(f"⚠️ [industry_stats] 변경 감지 불가 → {REFRESH_INTERVAL_SECONDS}초 주기 재계산으로 전환: {e}")
+            return
+        except PyMongoError as e:
+            print(f"⚠️ [industry_stats] 변경 감지 끊김 → {WATCH_RETRY_SECONDS}초 후 재연결: {e}")
+
+        time.sleep(WATCH_RETRY_SECONDS)
+        # 끊겨 있던 동안의 변경을 반영한 뒤 다시 감지
+        _flush_changes(set(), full_refresh=True)
+
+
+def _periodic_loop():
+    while True:
+        time.sleep(REFRESH_INTERVAL_SECONDS)
+        _flush_changes(set(), full_refresh=True)
+
+
+def _bootstrap():
+    # ✅ 서버가 내려가 있던 동안의 변경도 반영되도록 기동 시 항상 전체 재계산
+    _flush_changes(set(), full_refresh=True)
+    _watch_loop()
+    # change stream 을 쓸 수 없으면(단일 mongod) 주기적 전체 재계산
+    _periodic_loop()
+
+
+def start_background_refresh():
+    thread = threading.Thread(target=_bootstrap, name="industry-stats", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    refresh_industry_stats()
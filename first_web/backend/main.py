@@ -1,17 +1,48 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import time
+
+# ✅ 기동 시간 측정 시작 (import 포함)
+BOOT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pymongo import MongoClient
 from bson.json_util import dumps
 import json
-import pandas as pd
+import numpy as np
 import math 
+import os
 from collections import defaultdict
-import FinanceDataReader as fdr
 from datetime import datetime, timedelta
-from database import db
+import database
+from database import async_db
+import industry_stats
+import indexes
+import company_data
+from company_directory import directory
+from tickers import load_ticker_map
+from search_index import company_search
+from price_store import price_store
+import screener
+from screener import screening_engine
+from averages import yearly_averages
+from percentile_index import percentile_index, CATEGORY_KEYS, PERCENTILE_FIELDS
 from routes import user, favorites
 from fastapi.responses import JSONResponse
-import yfinance as yf
+from pydantic import BaseModel
+from typing import List
+import market_data
+import timeseries
+import risk
+import indicators
+from indicators import indicator_cache
+from quote_service import quote_service
+from market_snapshot import market_snapshot, MOVERS_LIMIT
+from sector_heatmap import heatmap_cache
+
+# ✅ 기동 단계별 소요 시간(초) / 허용 예산
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "3"))
+boot_timings = {"import": time.perf_counter() - BOOT_STARTED}
 
 app = FastAPI()
 
@@ -21,524 +52,236 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 app.include_router(user.router)
 app.include_router(favorites.router)
 
-@app.get("/")
-async def read_root():
-    return {"message": "Stock Investment Helper API"}
+@app.on_event("startup")
+def start_background_jobs():
+    started = time.perf_counter()
 
-@app.get("/company/{company_name}/financials")
-async def get_company_financials(company_name: str):
+    # ✅ 조회에 필요한 인덱스 보장
     try:
-        company_name_str = str(company_name)
-        print(f"Searching for company: {company_name_str}")
-
-        # ✅ 여러 연도 데이터 모두 가져오기
-        cursor = db.finacial_statement.find({'회사명': company_name_str}, {'_id': 0})
-        data = sorted(list(cursor), key=lambda x: x.get("연도", 0))
-
-        if not data:
-            all_companies = list(db.finacial_statement.distinct("회사명"))
-            raise HTTPException(status_code=404, detail=f"Company not found. Available companies: {all_companies}")
-        
-        # ✅ NaN/Inf 정리
-        cleaned_data = []
-        for entry in data:
-            cleaned = {
-                k: (0 if isinstance(v, float) and (math.isnan(v) or math.isinf(v)) else v)
-                for k, v in entry.items()
-            }
-            cleaned_data.append(cleaned)
-
-        return cleaned_data
-
+        indexes.ensure_indexes()
     except Exception as e:
-        print(f"Error in get_company_financials: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-    
-@app.get("/company/{company_name}/financials")
-async def get_company_financials(company_name: str):
-    try:
-        company_name_str = str(company_name)
-        print(f"Searching for company: {company_name_str}")
-
-        financials = db.finacial_statement.find_one({'회사명': company_name_str}, {'_id': 0})
-        print(f"Found financials: {financials}")
+        print(f"⚠️ [indexes] 인덱스 확인 실패: {e}")
 
-        if not financials:
-            all_companies = list(db.finacial_statement.distinct("회사명"))
-            print(f"Available companies: {all_companies}")
-            raise HTTPException(status_code=404, detail=f"Company not found. Available companies: {all_companies}")
-
-        clean = {
-            k: (0 if isinstance(v, float) and (math.isnan(v) or math.isinf(v)) else v)
-            for k, v in financials.items()
-        }
+    # ✅ 컬렉션 변경 감지 (스냅샷 버전용)
+    database.start_change_watch()
 
-        return clean
-    except Exception as e:
-        print(f"Error in get_company_financials: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/company/{company_name}/nonfinancials")
-async def get_company_nonfinancials(company_name: str):
+    # ✅ 회사/업종 디렉터리 적재
     try:
-        years = [2021, 2022, 2023, 2024]
-        basic_data = []
-
-        # ✅ 업종 정보 확인
-        cat_doc = db.category.find_one({"종목명": company_name})
-        if not cat_doc or "GICS_4자리" not in cat_doc or "업종명" not in cat_doc:
-            raise HTTPException(status_code=404, detail="GICS 정보 또는 업종명 없음")
-
-        gics_code = cat_doc["GICS_4자리"]
-        industry_name = cat_doc["업종명"]
-
-        same_gics_docs = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-        company_names = [doc["종목명"] for doc in same_gics_docs]
-
-        # ✅ 연도별 데이터 저장용
-        female_director_chart = defaultdict(list)
-        director_ratio_chart = defaultdict(list)
-        shareholder_ratio_chart = defaultdict(list)
-
-        for year in years:
-            # 현재 회사 데이터
-            esg = db.ESG_rate.find_one({'회사명': company_name, '연도': year}, {'_id': 0})
-            director = db.director_ratio.find_one({'회사명': company_name, '연도': year}, {'_id': 0})
-            shareholder = db.share_holder_ratio.find_one({'회사명': company_name, '연도': year}, {'_id': 0})
-
-            if not any([esg, director, shareholder]):
-                continue
-
-            year_data = {
-                "연도": year,
-                "ESG": esg.get("종합등급", "N/A") if esg else "N/A",
-                "directorRatio": director.get("사외이사 비율(%)", "N/A") if director else "N/A",
-                "femaleDirectorRatio": director.get("여성이사 비율", "N/A") if director else "N/A",
-                "shareholderRatio": shareholder.get("최대주주지분율", "N/A") if shareholder else "N/A"
-            }
-            basic_data.append(year_data)
-
-        # ✅ 업종평균 포함한 차트 데이터 계산 함수
-        def compute_industry_avg(collection, field, alias):
-            result = []
-            for year in years:
-                docs = collection.find({'회사명': {'$in': company_names}, '연도': year, field: {'$ne': None}}, {'회사명': 1, field: 1, '연도': 1})
-                values = [doc[field] for doc in docs if isinstance(doc[field], (int, float))]
-                industry_avg = round(sum(values) / len(values), 2) if values else None
-
-                company_doc = collection.find_one({'회사명': company_name, '연도': year}, {field: 1})
-                company_val = company_doc.get(field) if company_doc else None
-
-                if company_val is not None or industry_avg is not None:
-                    result.append({
-                        "year": year,
-                        alias: company_val,
-                        "업종평균": industry_avg
-                    })
-            return result
-
-        # ✅ 차트 데이터 생성
-        female_director_chart = compute_industry_avg(db.director_ratio, "여성이사 비율", "여성이사 비율")
-        director_ratio_chart = compute_industry_avg(db.director_ratio, "사외이사 비율(%)", "사외이사 비율(%)")
-        shareholder_ratio_chart = compute_industry_avg(db.share_holder_ratio, "최대주주지분율", "최대주주지분율")
-
-        # ✅ ESG 분석 데이터도 포함
-        analysis_data = get_esg_trend(company_name)
-
-        return JSONResponse(content={
-            "basic": basic_data,
-            "analysis": analysis_data,
-            "female_director_chart": female_director_chart,
-            "director_ratio_chart": director_ratio_chart,
-            "shareholder_ratio_chart": shareholder_ratio_chart,
-            "industry_name": industry_name
-        })
-
+        directory.load()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@app.get("/company/{company_name}/nonfinancials")
-async def get_company_nonfinancials(company_name: str):
-    try:
-        years = [2021, 2022, 2023, 2024]
-        basic_data = []
+        print(f"⚠️ [company_directory] 초기 적재 실패: {e}")
 
-        # ✅ 업종 정보 확인
-        cat_doc = db.category.find_one({"종목명": company_name})
-        if not cat_doc or "GICS_4자리" not in cat_doc or "업종명" not in cat_doc:
-            raise HTTPException(status_code=404, detail="GICS 정보 또는 업종명 없음")
+    # ✅ 첫 요청이 전체 스캔을 기다리지 않도록 스크리너·백분위 스냅샷 미리 생성 (백그라운드)
+    screening_engine.refresh_in_background()
+    percentile_index.refresh_in_background()
 
-        gics_code = cat_doc["GICS_4자리"]
-        industry_name = cat_doc["업종명"]
+    # ✅ 업종 통계 초기 집계 + 원본 변경 감지
+    industry_stats.start_background_refresh()
 
-        same_gics_docs = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-        company_names = [doc["종목명"] for doc in same_gics_docs]
+    # ✅ 조회 중인 티커 시세 폴링
+    quote_service.start()
 
-        # ✅ 연도별 데이터 저장용
-        female_director_chart = defaultdict(list)
-        director_ratio_chart = defaultdict(list)
-        shareholder_ratio_chart = defaultdict(list)
+    # ✅ 전 종목 시세 스냅샷 주기 갱신 (상승/하락/거래대금 순위)
+    market_snapshot.start(ticker_map)
 
-        for year in years:
-            # 현재 회사 데이터
-            esg = db.ESG_rate.find_one({'회사명': company_name, '연도': year}, {'_id': 0})
-            director = db.director_ratio.find_one({'회사명': company_name, '연도': year}, {'_id': 0})
-            shareholder = db.share_holder_ratio.find_one({'회사명': company_name, '연도': year}, {'_id': 0})
+    boot_timings["startup_jobs"] = time.perf_counter() - started
 
-            if not any([esg, director, shareholder]):
-                continue
-
-            year_data = {
-                "연도": year,
-                "ESG": esg.get("종합등급", "N/A") if esg else "N/A",
-                "directorRatio": director.get("사외이사 비율(%)", "N/A") if director else "N/A",
-                "femaleDirectorRatio": director.get("여성이사 비율", "N/A") if director else "N/A",
-                "shareholderRatio": shareholder.get("최대주주지분율", "N/A") if shareholder else "N/A"
-            }
-            basic_data.append(year_data)
-
-        # ✅ 업종평균 포함한 차트 데이터 계산 함수
-        def compute_industry_avg(collection, field, alias):
-            result = []
-            for year in years:
-                docs = collection.find({'회사명': {'$in': company_names}, '연도': year, field: {'$ne': None}}, {'회사명': 1, field: 1, '연도': 1})
-                values = [doc[field] for doc in docs if isinstance(doc[field], (int, float))]
-                industry_avg = round(sum(values) / len(values), 2) if values else None
-
-                company_doc = collection.find_one({'회사명': company_name, '연도': year}, {field: 1})
-                company_val = company_doc.get(field) if company_doc else None
-
-                if company_val is not None or industry_avg is not None:
-                    result.append({
-                        "year": year,
-                        alias: company_val,
-                        "업종평균": industry_avg
-                    })
-            return result
-
-        # ✅ 차트 데이터 생성
-        female_director_chart = compute_industry_avg(db.director_ratio, "여성이사 비율", "여성이사 비율")
-        director_ratio_chart = compute_industry_avg(db.director_ratio, "사외이사 비율(%)", "사외이사 비율(%)")
-        shareholder_ratio_chart = compute_industry_avg(db.share_holder_ratio, "최대주주지분율", "최대주주지분율")
-
-        # ✅ ESG 분석 데이터도 포함
-        analysis_data = get_esg_trend(company_name)
-
-        return JSONResponse(content={
-            "basic": basic_data,
-            "analysis": analysis_data,
-            "female_director_chart": female_director_chart,
-            "director_ratio_chart": director_ratio_chart,
-            "shareholder_ratio_chart": shareholder_ratio_chart,
-            "industry_name": industry_name
-        })
 
+@app.on_event("startup")
+async def warm_up_database():
+    # ✅ 공유 커넥션 풀 미리 연결
+    started = time.perf_counter()
+    try:
+        await database.warm_up()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"⚠️ [database] 연결 확인 실패: {e}")
+    boot_timings["db_warm_up"] = time.perf_counter() - started
 
 
-@app.get("/company/{company_name}/analysis")
-def get_esg_trend(company_name: str):
-
-    # ✅ 업종 코드 확인
-    cat_doc = db.category.find_one({"종목명": company_name})
-    if not cat_doc or "GICS_4자리" not in cat_doc or "업종명" not in cat_doc:
-        raise HTTPException(status_code=404, detail="GICS 정보 또는 업종명 없음")
+@app.on_event("startup")
+def report_boot_time():
+    total = time.perf_counter() - BOOT_STARTED
+    phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in boot_timings.items())
+    mark = "✅" if total <= STARTUP_BUDGET_SECONDS else "⚠️"
+    print(f"{mark} [startup] {total:.2f}s / 예산 {STARTUP_BUDGET_SECONDS:.1f}s ({phases})")
 
-    gics_code = cat_doc["GICS_4자리"]
-    industry_name = cat_doc["업종명"]
 
-    # ✅ 동업종 기업명 확보
-    same_gics_docs = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-    company_names = [doc["종목명"] for doc in same_gics_docs]
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await quote_service.stop()
+    await market_snapshot.stop()
+    database.close()
 
-    # ✅ ESG 점수 매핑
-    grade_map = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
-    fields = ["종합등급", "환경", "사회", "지배구조"]
-
-    # ✅ 회사 ESG 데이터
-    company_cursor = db.ESG_rate.find({"회사명": company_name})
-    company_by_year = defaultdict(dict)
-    for row in company_cursor:
-        year = row.get("연도")
-        for f in fields:
-            score = grade_map.get(row.get(f))
-            if score:
-                company_by_year[year][f] = score
-
-    # ✅ 업종 ESG 평균
-    industry_cursor = db.ESG_rate.find({"회사명": {"$in": company_names}})
-    industry_acc = defaultdict(lambda: defaultdict(list))
-    for row in industry_cursor:
-        year = row.get("연도")
-        for f in fields:
-            score = grade_map.get(row.get(f))
-            if score:
-                industry_acc[year][f].append(score)
+@app.get("/")
+async def read_root():
+    return {"message": "Stock Investment Helper API"}
 
-    industry_avg_by_year = {
-        year: {
-            f: round(sum(v) / len(v), 2) if v else None
-            for f, v in fields_dict.items()
-        }
-        for year, fields_dict in industry_acc.items()
+# ✅ 상류(yfinance/FDR)별 캐시 적중·실패·차단 현황
+@app.get("/diagnostics/upstream")
+def get_upstream_diagnostics():
+    return {
+        "sources": market_data.upstream_stats.report(),
+        "cache_entries": len(market_data.upstream_cache),
     }
 
-    # ✅ 환경투자비율 데이터 불러오기
-    env_cursor = db.environment_ratio.find({"회사명": {"$in": [company_name] + company_names}})
-    env_dict = defaultdict(list)
-    for row in env_cursor:
-        year = row["연도"]
-        cname = row["회사명"]
-        ratio = row["환경투자비율"]
-        env_dict[year].append((cname, ratio))
-
-    # ✅ 연도별 환경투자비율 및 평균 계산
-    env_ratio_by_year = {}
-    for year, values in env_dict.items():
-        company_val = next((v for c, v in values if c == company_name), None)
-        avg_val = round(sum(v for _, v in values if v is not None) / len(values), 4)
-        env_ratio_by_year[year] = {
-            "회사": company_val,
-            "업종평균": avg_val
-        }
+# ✅ 엔드포인트 조회 형태별 실행 계획 (COLLSCAN 감지)
+@app.get("/diagnostics/indexes")
+def get_index_diagnostics(company_name: str | None = None):
+    report = indexes.explain_query_shapes(company_name)
+    return {
+        "collscans": sum(row["collscan"] for row in report),
+        "queries": report
+    }
 
+async def load_financials(company_name):
+    # ✅ 여러 연도 데이터 모두 가져오기
+    cursor = async_db.finacial_statement.find({'회사명': company_name}, {'_id': 0})
+    data = sorted(await cursor.to_list(None), key=lambda x: x.get("연도", 0))
 
-        # ✅ 매출단위당 에너지/온실가스 자료 불러오기
-    sales_cursor = db.environment_sales.find({"회사명": {"$in": [company_name] + company_names}})
-    sales_dict = defaultdict(list)
-    for row in sales_cursor:
-        year = row.get("연도")
-        cname = row.get("회사명")
-        gas = row.get("매출단위당_온실가스배출량")
-        energy = row.get("매출단위당_에너지사용량")
-        if year and cname:
-            sales_dict[year].append({
-                "회사명": cname,
-                "온실가스": gas,
-                "에너지": energy
-            })
-
-    # ✅ 연도별 평균 계산 및 회사 데이터 분리
-    sales_ratio_by_year = {}
-    for year, values in sales_dict.items():
-        company_gas = next((v["온실가스"] for v in values if v["회사명"] == company_name), None)
-        company_energy = next((v["에너지"] for v in values if v["회사명"] == company_name), None)
-        gas_list = [v["온실가스"] for v in values if v["온실가스"] is not None]
-        energy_list = [v["에너지"] for v in values if v["에너지"] is not None]
-        sales_ratio_by_year[year] = {
-            "회사_온실가스": company_gas,
-            "회사_에너지": company_energy,
-            "업종평균_온실가스": round(sum(gas_list)/len(gas_list), 10) if gas_list else None,
-            "업종평균_에너지": round(sum(energy_list)/len(energy_list), 10) if energy_list else None,
+    # ✅ NaN/Inf 정리
+    cleaned_data = []
+    for entry in data:
+        cleaned = {
+            k: (0 if isinstance(v, float) and (math.isnan(v) or math.isinf(v)) else v)
+            for k, v in entry.items()
         }
+        cleaned_data.append(cleaned)
+    return cleaned_data
 
-    # ✅ 연도 기준 통합
-    all_years = sorted(set(company_by_year.keys()) | set(industry_avg_by_year.keys()) |
-                       set(env_ratio_by_year.keys()) | set(sales_ratio_by_year.keys()))
-    
-    result = []
-    for year in all_years:
-        result.append({
-            "year": year,
-            "company": company_by_year.get(year, {}),
-            "industry_avg": industry_avg_by_year.get(year, {}),
-            "env_ratio": env_ratio_by_year.get(year, {}),
-            "sales_ratio": sales_ratio_by_year.get(year, {}),
-            "industry_name": industry_name
-        })
 
-    return result
+@app.get("/company/{company_name}/financials")
+async def get_company_financials(company_name: str):
+    try:
+        company_name_str = str(company_name)
+        print(f"Searching for company: {company_name_str}")
 
-@app.get("/company/{company_name}/analysis")
-def get_esg_trend(company_name: str):
+        cleaned_data = await load_financials(company_name_str)
+        if not cleaned_data:
+            # ✅ 전체 목록 대신 비슷한 회사명 몇 개만 제안
+            suggestions = company_search.suggest(company_name_str)
+            raise HTTPException(status_code=404, detail=f"Company not found. Did you mean: {suggestions}")
 
-    # ✅ 업종 코드 확인
-    cat_doc = db.category.find_one({"종목명": company_name})
-    if not cat_doc or "GICS_4자리" not in cat_doc or "업종명" not in cat_doc:
-        raise HTTPException(status_code=404, detail="GICS 정보 또는 업종명 없음")
+        return cleaned_data
 
-    gics_code = cat_doc["GICS_4자리"]
-    industry_name = cat_doc["업종명"]
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_company_financials: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-    # ✅ 동업종 기업명 확보
-    same_gics_docs = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-    company_names = [doc["종목명"] for doc in same_gics_docs]
+NONFINANCIAL_YEARS = [2021, 2022, 2023, 2024]
+ESG_TREND_COLLECTIONS = ["ESG_rate", "environment_ratio", "environment_sales"]
 
-    # ✅ ESG 점수 매핑
-    grade_map = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
-    fields = ["종합등급", "환경", "사회", "지배구조"]
 
-    # ✅ 회사 ESG 데이터
-    company_cursor = db.ESG_rate.find({"회사명": company_name})
-    company_by_year = defaultdict(dict)
-    for row in company_cursor:
-        year = row.get("연도")
-        for f in fields:
-            score = grade_map.get(row.get(f))
-            if score:
-                company_by_year[year][f] = score
-
-    # ✅ 업종 ESG 평균
-    industry_cursor = db.ESG_rate.find({"회사명": {"$in": company_names}})
-    industry_acc = defaultdict(lambda: defaultdict(list))
-    for row in industry_cursor:
-        year = row.get("연도")
-        for f in fields:
-            score = grade_map.get(row.get(f))
-            if score:
-                industry_acc[year][f].append(score)
+def get_category_doc(company_name: str):
+    # ✅ 업종 정보 확인 (메모리 디렉터리)
+    cat_doc = directory.get(company_name)
+    if not cat_doc or cat_doc["업종명"] is None:
+        raise HTTPException(status_code=404, detail="GICS 정보 또는 업종명 없음")
+    return cat_doc
 
-    industry_avg_by_year = {
-        year: {
-            f: round(sum(v) / len(v), 2) if v else None
-            for f, v in fields_dict.items()
-        }
-        for year, fields_dict in industry_acc.items()
-    }
 
-    # ✅ 환경투자비율 데이터 불러오기
-    env_cursor = db.environment_ratio.find({"회사명": {"$in": [company_name] + company_names}})
-    env_dict = defaultdict(list)
-    for row in env_cursor:
-        year = row["연도"]
-        cname = row["회사명"]
-        ratio = row["환경투자비율"]
-        env_dict[year].append((cname, ratio))
-
-    # ✅ 연도별 환경투자비율 및 평균 계산
-    env_ratio_by_year = {}
-    for year, values in env_dict.items():
-        company_val = next((v for c, v in values if c == company_name), None)
-        avg_val = round(sum(v for _, v in values if v is not None) / len(values), 4)
-        env_ratio_by_year[year] = {
-            "회사": company_val,
-            "업종평균": avg_val
-        }
+async def load_nonfinancials(company_name, cat_doc):
+    years = NONFINANCIAL_YEARS
+    basic_data = []
+    industry_name = cat_doc["업종명"]
 
+    # ✅ 미리 집계된 업종 통계 (업종당 문서 1개)
+    stats_doc = await industry_stats.get_industry_stats_async(cat_doc["GICS_4자리"])
 
-        # ✅ 매출단위당 에너지/온실가스 자료 불러오기
-    sales_cursor = db.environment_sales.find({"회사명": {"$in": [company_name] + company_names}})
-    sales_dict = defaultdict(list)
-    for row in sales_cursor:
-        year = row.get("연도")
-        cname = row.get("회사명")
-        gas = row.get("매출단위당_온실가스배출량")
-        energy = row.get("매출단위당_에너지사용량")
-        if year and cname:
-            sales_dict[year].append({
-                "회사명": cname,
-                "온실가스": gas,
-                "에너지": energy
-            })
-
-    # ✅ 연도별 평균 계산 및 회사 데이터 분리
-    sales_ratio_by_year = {}
-    for year, values in sales_dict.items():
-        company_gas = next((v["온실가스"] for v in values if v["회사명"] == company_name), None)
-        company_energy = next((v["에너지"] for v in values if v["회사명"] == company_name), None)
-        gas_list = [v["온실가스"] for v in values if v["온실가스"] is not None]
-        energy_list = [v["에너지"] for v in values if v["에너지"] is not None]
-        sales_ratio_by_year[year] = {
-            "회사_온실가스": company_gas,
-            "회사_에너지": company_energy,
-            "업종평균_온실가스": round(sum(gas_list)/len(gas_list), 10) if gas_list else None,
-            "업종평균_에너지": round(sum(energy_list)/len(energy_list), 10) if energy_list else None,
+    # ✅ 회사 데이터는 컬렉션 5개를 한 번의 파이프라인으로 조회
+    rows = await company_data.fetch_company_rows(
+        company_name, ["director_ratio", "share_holder_ratio"] + ESG_TREND_COLLECTIONS
+    )
+    esg_by_year = company_data.rows_by_year(rows["ESG_rate"])
+    director_by_year = company_data.rows_by_year(rows["director_ratio"])
+    shareholder_by_year = company_data.rows_by_year(rows["share_holder_ratio"])
+
+    for year in years:
+        # 현재 회사 데이터
+        esg = esg_by_year.get(year)
+        director = director_by_year.get(year)
+        shareholder = shareholder_by_year.get(year)
+
+        if not any([esg, director, shareholder]):
+            continue
+
+        year_data = {
+            "연도": year,
+            "ESG": esg.get("종합등급", "N/A") if esg else "N/A",
+            "directorRatio": director.get("사외이사 비율(%)", "N/A") if director else "N/A",
+            "femaleDirectorRatio": director.get("여성이사 비율", "N/A") if director else "N/A",
+            "shareholderRatio": shareholder.get("최대주주지분율", "N/A") if shareholder else "N/A"
         }
+        basic_data.append(year_data)
 
-    # ✅ 연도 기준 통합
-    all_years = sorted(set(company_by_year.keys()) | set(industry_avg_by_year.keys()) |
-                       set(env_ratio_by_year.keys()) | set(sales_ratio_by_year.keys()))
-    
-    result = []
-    for year in all_years:
-        result.append({
-            "year": year,
-            "company": company_by_year.get(year, {}),
-            "industry_avg": industry_avg_by_year.get(year, {}),
-            "env_ratio": env_ratio_by_year.get(year, {}),
-            "sales_ratio": sales_ratio_by_year.get(year, {}),
-            "industry_name": industry_name
-        })
-
-    return result
+    # ✅ 업종평균 포함한 차트 데이터 계산 함수
+    def compute_industry_avg(collection_name, company_by_year, field, alias):
+        industry_avgs = industry_stats.metric_averages(stats_doc, collection_name, field, 2)
+        result = []
+        for year in years:
+            industry_avg = industry_avgs.get(year)
 
+            company_doc = company_by_year.get(year)
+            company_val = company_doc.get(field) if company_doc else None
 
-metric_map = {
-    "부채비율": "부채비율",
-    "ROE": "ROE(%)",
-    "ROA": "ROA(%)",
-    "자산총계": "자산총계",
-    "영업이익": "영업이익",
-    "영업이익률": "영업이익률",
-    "순이익률": "순이익률",
-    "자본유보율": "자본유보율",
-    "자기자본비율": "자기자본비율",
-    "매출액증가율": "매출액증가율",
-    "이익증가율": "이익증가율",
-    "자산증가율": "자산증가율",
-    "FCF": "FCF",
-    "EPS": "EPS(기본)"
-}
-@app.get("/average/{metric_name}")
-def get_average_by_year(metric_name: str):
-    field = metric_map.get(metric_name)
-    if not field:
-        raise HTTPException(status_code=400, detail="지원하지 않는 지표입니다.")
+            if company_val is not None or industry_avg is not None:
+                result.append({
+                    "year": year,
+                    alias: company_val,
+                    "업종평균": industry_avg
+                })
+        return result
 
-    cursor = db.finacial_statement.find({}, {"_id": 0, "연도": 1, field: 1})
+    # ✅ 차트 데이터 생성
+    female_director_chart = compute_industry_avg("director_ratio", director_by_year, "여성이사 비율", "여성이사 비율")
+    director_ratio_chart = compute_industry_avg("director_ratio", director_by_year, "사외이사 비율(%)", "사외이사 비율(%)")
+    shareholder_ratio_chart = compute_industry_avg("share_holder_ratio", shareholder_by_year, "최대주주지분율", "최대주주지분율")
 
-    data_by_year = defaultdict(list)
+    # ✅ ESG 분석 데이터도 포함 (이미 조회한 데이터 재사용)
+    analysis_data = build_esg_trend(company_name, industry_name, stats_doc, rows)
 
-    for doc in cursor:
-        year = doc.get("연도")
-        value = doc.get(field)
-        if isinstance(value, (int, float)) and not math.isnan(value):
-            data_by_year[year].append(value)
+    return {
+        "basic": basic_data,
+        "analysis": analysis_data,
+        "female_director_chart": female_director_chart,
+        "director_ratio_chart": director_ratio_chart,
+        "shareholder_ratio_chart": shareholder_ratio_chart,
+        "industry_name": industry_name
+    }
 
-    result = []
-    for year in sorted(data_by_year.keys()):
-        values = data_by_year[year]
-        avg = sum(values) / len(values) if values else 0
-        result.append({
-            "year": year,
-            "average": round(avg, 2)
-        })
 
-    if not result:
-        raise HTTPException(status_code=404, detail="해당 지표에 대한 데이터가 없습니다.")
+@app.get("/company/{company_name}/nonfinancials")
+async def get_company_nonfinancials(company_name: str):
+    try:
+        cat_doc = get_category_doc(company_name)
+        return JSONResponse(content=await load_nonfinancials(company_name, cat_doc))
 
-    return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/company/{company_name}/analysis")
-def get_esg_trend(company_name: str):
-
-    # ✅ 업종 코드 확인
-    cat_doc = db.category.find_one({"종목명": company_name})
-    if not cat_doc or "GICS_4자리" not in cat_doc or "업종명" not in cat_doc:
-        raise HTTPException(status_code=404, detail="GICS 정보 또는 업종명 없음")
-
-    gics_code = cat_doc["GICS_4자리"]
-    industry_name = cat_doc["업종명"]
+async def get_esg_trend(company_name: str):
+    cat_doc = get_category_doc(company_name)
+    stats_doc = await industry_stats.get_industry_stats_async(cat_doc["GICS_4자리"])
+    rows = await company_data.fetch_company_rows(company_name, ESG_TREND_COLLECTIONS)
+    return build_esg_trend(company_name, cat_doc["업종명"], stats_doc, rows)
 
-    # ✅ 동업종 기업명 확보
-    same_gics_docs = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-    company_names = [doc["종목명"] for doc in same_gics_docs]
 
+def build_esg_trend(company_name, industry_name, stats_doc, rows):
     # ✅ ESG 점수 매핑
-    grade_map = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
+    grade_map = industry_stats.GRADE_MAP
     fields = ["종합등급", "환경", "사회", "지배구조"]
 
     # ✅ 회사 ESG 데이터
-    company_cursor = db.ESG_rate.find({"회사명": company_name})
     company_by_year = defaultdict(dict)
-    for row in company_cursor:
+    for row in rows["ESG_rate"]:
         year = row.get("연도")
         for f in fields:
             score = grade_map.get(row.get(f))
@@ -546,71 +289,35 @@ def get_esg_trend(company_name: str):
                 company_by_year[year][f] = score
 
     # ✅ 업종 ESG 평균
-    industry_cursor = db.ESG_rate.find({"회사명": {"$in": company_names}})
-    industry_acc = defaultdict(lambda: defaultdict(list))
-    for row in industry_cursor:
-        year = row.get("연도")
-        for f in fields:
-            score = grade_map.get(row.get(f))
-            if score:
-                industry_acc[year][f].append(score)
-
-    industry_avg_by_year = {
+    industry_avg_by_year = defaultdict(dict)
+    for f in fields:
+        for year, avg in industry_stats.metric_averages(stats_doc, "ESG_rate", f, 2).items():
+            industry_avg_by_year[year][f] = avg
+
+    # ✅ 연도별 환경투자비율 및 업종평균
+    env_company = {row["연도"]: row.get("환경투자비율") for row in rows["environment_ratio"]}
+    env_avg = industry_stats.metric_averages(stats_doc, "environment_ratio", "환경투자비율", 4)
+    env_ratio_by_year = {
         year: {
-            f: round(sum(v) / len(v), 2) if v else None
-            for f, v in fields_dict.items()
+            "회사": env_company.get(year),
+            "업종평균": env_avg.get(year)
         }
-        for year, fields_dict in industry_acc.items()
+        for year in set(env_company) | set(env_avg)
     }
 
-    # ✅ 환경투자비율 데이터 불러오기
-    env_cursor = db.environment_ratio.find({"회사명": {"$in": [company_name] + company_names}})
-    env_dict = defaultdict(list)
-    for row in env_cursor:
-        year = row["연도"]
-        cname = row["회사명"]
-        ratio = row["환경투자비율"]
-        env_dict[year].append((cname, ratio))
-
-    # ✅ 연도별 환경투자비율 및 평균 계산
-    env_ratio_by_year = {}
-    for year, values in env_dict.items():
-        company_val = next((v for c, v in values if c == company_name), None)
-        avg_val = round(sum(v for _, v in values if v is not None) / len(values), 4)
-        env_ratio_by_year[year] = {
-            "회사": company_val,
-            "업종평균": avg_val
-        }
-
-
-        # ✅ 매출단위당 에너지/온실가스 자료 불러오기
-    sales_cursor = db.environment_sales.find({"회사명": {"$in": [company_name] + company_names}})
-    sales_dict = defaultdict(list)
-    for row in sales_cursor:
-        year = row.get("연도")
-        cname = row.get("회사명")
-        gas = row.get("매출단위당_온실가스배출량")
-        energy = row.get("매출단위당_에너지사용량")
-        if year and cname:
-            sales_dict[year].append({
-                "회사명": cname,
-                "온실가스": gas,
-                "에너지": energy
-            })
-
-    # ✅ 연도별 평균 계산 및 회사 데이터 분리
-    sales_ratio_by_year = {}
-    for year, values in sales_dict.items():
-        company_gas = next((v["온실가스"] for v in values if v["회사명"] == company_name), None)
-        company_energy = next((v["에너지"] for v in values if v["회사명"] == company_name), None)
-        gas_list = [v["온실가스"] for v in values if v["온실가스"] is not None]
-        energy_list = [v["에너지"] for v in values if v["에너지"] is not None]
-        sales_ratio_by_year[year] = {
-            "회사_온실가스": company_gas,
-            "회사_에너지": company_energy,
-            "업종평균_온실가스": round(sum(gas_list)/len(gas_list), 10) if gas_list else None,
-            "업종평균_에너지": round(sum(energy_list)/len(energy_list), 10) if energy_list else None,
+    # ✅ 매출단위당 에너지/온실가스 (회사 데이터 + 업종평균)
+    sales_company = {row["연도"]: row for row in rows["environment_sales"] if row.get("연도")}
+    gas_avg = industry_stats.metric_averages(stats_doc, "environment_sales", "매출단위당_온실가스배출량", 10)
+    energy_avg = industry_stats.metric_averages(stats_doc, "environment_sales", "매출단위당_에너지사용량", 10)
+    sales_ratio_by_year = {
+        year: {
+            "회사_온실가스": sales_company.get(year, {}).get("매출단위당_온실가스배출량"),
+            "회사_에너지": sales_company.get(year, {}).get("매출단위당_에너지사용량"),
+            "업종평균_온실가스": gas_avg.get(year),
+            "업종평균_에너지": energy_avg.get(year),
         }
+        for year in set(sales_company) | set(gas_avg) | set(energy_avg)
+    }
 
     # ✅ 연도 기준 통합
     all_years = sorted(set(company_by_year.keys()) | set(industry_avg_by_year.keys()) |
@@ -629,7 +336,6 @@ def get_esg_trend(company_name: str):
 
     return result
 
-
 metric_map = {
     "부채비율": "부채비율",
     "ROE": "ROE(%)",
@@ -646,193 +352,246 @@ metric_map = {
     "FCF": "FCF",
     "EPS": "EPS(기본)"
 }
+def resolve_metrics(metrics):
+    fields = []
+    for metric in metrics:
+        field = metric_map.get(metric)
+        if not field:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 지표: {metric}")
+        fields.append(field)
+    return fields
+
+
+def yearly_series(averages):
+    return [{"year": year, "average": averages[year]} for year in sorted(averages)]
+
+
+# ✅ 여러 지표의 연도별 평균을 한 번에 (gics 또는 company_name 으로 업종 범위 지정)
+@app.get("/averages")
+def get_averages(
+    metrics: List[str] = Query(...),
+    gics: str | None = None,
+    company_name: str | None = None
+):
+    industry_name = None
+    if company_name is not None:
+        cat_doc = directory.get(company_name)
+        if not cat_doc:
+            raise HTTPException(status_code=404, detail="GICS 정보 없음")
+        gics = cat_doc["GICS_4자리"]
+        industry_name = cat_doc["업종명"] or "알 수 없음"
+
+    fields = resolve_metrics(metrics)
+
+    # ✅ 업종 평균은 미리 집계된 업종 통계, 시장 전체 평균은 $group 한 번
+    if gics is not None:
+        stats_doc = industry_stats.get_industry_stats(gics)
+        data = {
+            metric: yearly_series(industry_stats.metric_averages(stats_doc, "finacial_statement", field, 2))
+            for metric, field in zip(metrics, fields)
+        }
+    else:
+        averages = yearly_averages(fields)
+        data = {metric: averages[field] for metric, field in zip(metrics, fields)}
+
+    return {
+        "GICS_4자리": gics,
+        "industry_name": industry_name,
+        "data": data
+    }
+
+
 @app.get("/average/{metric_name}")
 def get_average_by_year(metric_name: str):
     field = metric_map.get(metric_name)
     if not field:
         raise HTTPException(status_code=400, detail="지원하지 않는 지표입니다.")
 
-    cursor = db.finacial_statement.find({}, {"_id": 0, "연도": 1, field: 1})
-
-    data_by_year = defaultdict(list)
-
-    for doc in cursor:
-        year = doc.get("연도")
-        value = doc.get(field)
-        if isinstance(value, (int, float)) and not math.isnan(value):
-            data_by_year[year].append(value)
-
-    result = []
-    for year in sorted(data_by_year.keys()):
-        values = data_by_year[year]
-        avg = sum(values) / len(values) if values else 0
-        result.append({
-            "year": year,
-            "average": round(avg, 2)
-        })
-
+    result = yearly_averages([field])[field]
     if not result:
         raise HTTPException(status_code=404, detail="해당 지표에 대한 데이터가 없습니다.")
 
     return result
 
-
 @app.get("/average/{metric}/by-gics")
 def get_average_by_gics(metric: str, company_name: str):
     # 1. GICS 코드 찾기
-    cat_doc = db.category.find_one({"종목명": company_name})
-    if not cat_doc or "GICS_4자리" not in cat_doc:
+    cat_doc = directory.get(company_name)
+    if not cat_doc:
         raise HTTPException(status_code=404, detail="GICS 정보 없음")
 
     gics_code = cat_doc["GICS_4자리"]
-    industry_name = cat_doc.get("업종명", "알 수 없음")
+    industry_name = cat_doc["업종명"] or "알 수 없음"
 
     # 2. metric → 실제 필드명으로 매핑
     field = metric_map.get(metric)
     if not field:
         raise HTTPException(status_code=400, detail=f"지원하지 않는 지표: {metric}")
 
-    # 3. 같은 GICS 기업 리스트 확보
-    same_gics_docs = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-    company_names = [doc["종목명"] for doc in same_gics_docs]
-    print(f"✅ [GICS] {gics_code} 기업 수: {len(company_names)}")
-
-    # 4. 해당 기업들의 재무 데이터 조회
-    cursor = db.finacial_statement.find(
-        {"회사명": {"$in": company_names}},
-        {"_id": 0, "연도": 1, field: 1}
-    )
-
-    # 5. 연도별 평균 계산
-    data_by_year = defaultdict(list)
-
-    for doc in cursor:
-        year = doc.get("연도")
-        value = doc.get(field)
-
-        print(f"🔍 기업: {doc.get('회사명', 'N/A')} | 연도: {year} | {field} = {value}")
-
-        try:
-            v = float(value)
-            if not math.isnan(v):
-                data_by_year[int(year)].append(v)
-        except Exception as e:
-            print(f"⚠️ 값 무시됨 - year: {year}, value: {value}, error: {e}")
-
-    result = []
-    for year in sorted(data_by_year):
-        values = data_by_year[year]
-        avg = sum(values) / len(values) if values else 0
-        print(f"📊 {year} 평균 = {round(avg, 2)} from {len(values)}개 기업")
-        result.append({"year": year, "average": round(avg, 2)})
+    # 3. 미리 집계된 업종 통계에서 연도별 평균 조회
+    stats_doc = industry_stats.get_industry_stats(gics_code)
+    result = yearly_series(industry_stats.metric_averages(stats_doc, "finacial_statement", field, 2))
 
     return {
         "industry_name": industry_name,
         "data": result
     }
 
-df_codes = pd.read_excel("기업_리스트.xlsx")[['회사명', '종목코드']].dropna()
-df_codes['종목코드'] = df_codes['종목코드'].astype(float).astype(int).astype(str).str.zfill(6)
-df_codes['티커'] = df_codes['종목코드'] + ".KS"
-ticker_map = dict(zip(df_codes['회사명'], df_codes['티커']))
+ticker_started = time.perf_counter()
+ticker_map = load_ticker_map()
+directory.set_tickers(ticker_map)
+company_search.build(ticker_map)
+boot_timings["ticker_map"] = time.perf_counter() - ticker_started
+
+
+# ✅ 회사명/티커/초성 자동완성
+@app.get("/search")
+def search_companies(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    return {"query": q, "results": company_search.search(q, limit)}
+
 
 def get_ticker_by_name(name: str) -> str | None:
     return ticker_map.get(name)
 
-@app.get("/company/{company_name}/stock")
-async def get_company_stock_price(company_name: str):
-    ticker = get_ticker_by_name(company_name)
-    if not ticker:
-        raise HTTPException(status_code=404, detail="해당 회사명을 찾을 수 없습니다.")
+# ✅ 기간별 시세 (1주~10년)
+STOCK_PERIODS = {
+    "1주": timedelta(weeks=1),
+    "3달": timedelta(days=90),
+    "1년": timedelta(days=365),
+    "5년": timedelta(days=365*5),
+    "10년": timedelta(days=365*10)
+}
 
-    result = {}
+# ✅ max_points 지정 시 다운샘플링하는 장기 구간
+DOWNSAMPLE_PERIODS = {"5년", "10년"}
 
-    # ✅ 1일 데이터 (5분 단위, yfinance 사용)
-    try:
-        yf_ticker = yf.Ticker(ticker)
-        df = yf_ticker.history(period="1d", interval="5m")
-        df.index = df.index.tz_localize(None)
-
-        result["1일"] = [
-            {
-                "date": dt.strftime('%Y-%m-%d %H:%M'),
-                "price": float(row["Close"])
-            }
-            for dt, row in df.iterrows() if not pd.isna(row["Close"])
-        ]
-    except Exception as e:
-        print(f"[1일 yfinance 처리 오류] {e}")
-
-    # ✅ 기간별 시세 (1주~10년, FDR 사용)
-    periods = {
-        "1주": timedelta(weeks=1),
-        "3달": timedelta(days=90),
-        "1년": timedelta(days=365),
-        "5년": timedelta(days=365*5),
-        "10년": timedelta(days=365*10)
-    }
+# ✅ 주가 요청 전체 마감 시간(초): 넘기면 끝난 구간만 부분 응답
+STOCK_DEADLINE_SECONDS = float(os.getenv("STOCK_DEADLINE_SECONDS", "8"))
 
+
+def build_period_sections(code, columnar=False, max_points=None):
     end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
-    for period_name, delta in periods.items():
+    # ✅ 로컬 일봉 저장소를 한 번만 동기화한 뒤 기간별로 잘라서 사용
+    try:
+        price_store.refresh(code)
+    except Exception as e:
+        print(f"[일봉 동기화 오류] {e}")
+
+    sections = {}
+    for period_name, delta in STOCK_PERIODS.items():
         try:
-            start = end - delta
-            df = fdr.DataReader(ticker.replace(".KS", ""), start, end)
-            df.index = pd.to_datetime(df.index)
-            df = df.resample('1D').last().dropna().sort_index()
-
-            result[period_name] = [
-                {
-                    "date": date.strftime('%Y-%m-%d'),
-                    "price": float(row["Close"])
-                }
-                for date, row in df.iterrows()
-            ]
+            window = price_store.load(code, end - delta, end)
+            if window is None:
+                continue
+
+            dates, closes = window["date"], window["Close"]
+            if max_points and period_name in DOWNSAMPLE_PERIODS:
+                dates, closes = timeseries.downsample(dates, closes, max_points)
+
+            sections[period_name] = timeseries.serialize_series(
+                np.datetime_as_string(dates, unit="D").tolist(), closes.tolist(), columnar
+            )
         except Exception as e:
             print(f"[{period_name} 처리 오류] {e}")
+    return sections
 
-        # ✅ 최신 시세 정보 추가 (yfinance)
-    try:
-        df_latest = yf.Ticker(ticker).history(period="2d", interval="1d")
-        df_latest.index = pd.to_datetime(df_latest.index)
-        df_latest = df_latest.sort_index()
-
-        if len(df_latest) >= 2:
-            current_price = float(df_latest["Close"].iloc[-1])
-            prev_price = float(df_latest["Close"].iloc[-2])
-            change = current_price - prev_price
-            change_rate = (change / prev_price) * 100
-            value_traded = current_price * float(df_latest["Volume"].iloc[-1])
-
-            latest = df_latest.iloc[-1]
-            result["latest"] = {
-                "open": float(latest["Open"]),
-                "high": float(latest["High"]),
-                "low": float(latest["Low"]),
-                "volume": int(latest["Volume"]),
-                "current": current_price,
-                "change": round(change, 2),
-                "changeRate": round(change_rate, 2),
-                "valueTraded": int(value_traded),
-            }
-
-            # ✅ MongoDB에서 추가 정보 병합
-            stock_doc = db.stock_price.find_one({"회사명": company_name})
-            if stock_doc:
-                result["latest"]["EPS"] = stock_doc.get("EPS")
-                result["latest"]["BPS"] = stock_doc.get("BPS")
-                result["latest"]["PER"] = stock_doc.get("PER")
-                result["latest"]["PBR"] = stock_doc.get("PBR")
-                result["latest"]["배당수익률"] = stock_doc.get("배당수익률(%)")
 
-    except Exception as e:
-        print(f"[latest 시세 처리 오류] {e}")
+def merge_valuation(latest, stock_doc):
+    # ✅ MongoDB에서 추가 정보 병합
+    if latest is not None and stock_doc:
+        latest["EPS"] = stock_doc.get("EPS")
+        latest["BPS"] = stock_doc.get("BPS")
+        latest["PER"] = stock_doc.get("PER")
+        latest["PBR"] = stock_doc.get("PBR")
+        latest["배당수익률"] = stock_doc.get("배당수익률(%)")
+    return latest
+
+
+@app.get("/company/{company_name}/stock")
+async def get_company_stock_price(
+    company_name: str,
+    response_format: str = Query("rows", alias="format", pattern="^(rows|columnar)$"),
+    max_points: int | None = Query(None, ge=3),
+):
+    columnar = response_format == "columnar"
+    ticker = get_ticker_by_name(company_name)
+    if not ticker:
+        raise HTTPException(status_code=404, detail="해당 회사명을 찾을 수 없습니다.")
+
+    # ✅ 1일/latest 는 공유 시세 캐시, 기간별은 로컬 일봉 저장소에서 동시에 조회
+    fetched = await market_data.gather_with_deadline({
+        "시세": quote_service.get(ticker),
+        "기간별": market_data.run_upstream(build_period_sections, ticker.replace(".KS", ""), columnar, max_points),
+        "stock_price": async_db.stock_price.find_one({"회사명": company_name}),
+    }, timeout=STOCK_DEADLINE_SECONDS)
+
+    result = {}
+    quotes = fetched.get("시세")
+    if quotes is not None:
+        result["1일"] = quotes.intraday(columnar)
+    result.update(fetched.get("기간별", {}))
+
+    if quotes is not None and quotes.latest is not None:
+        result["latest"] = merge_valuation(dict(quotes.latest), fetched.get("stock_price"))
 
     if not result:
         raise HTTPException(status_code=404, detail="주가 데이터를 찾을 수 없습니다.")
 
     return result
 
+# ✅ 관심종목 일괄 시세
+BATCH_MAX_COMPANIES = 100
+SPARKLINE_POINTS = 20
+
+
+class BatchQuoteRequest(BaseModel):
+    companies: List[str]
+    sparkline: bool = False
+
+
+@app.post("/stocks/batch")
+async def get_batch_quotes(req: BatchQuoteRequest):
+    companies = list(dict.fromkeys(req.companies))
+    if len(companies) > BATCH_MAX_COMPANIES:
+        raise HTTPException(status_code=400, detail=f"최대 {BATCH_MAX_COMPANIES}개까지 조회할 수 있습니다.")
+
+    tickers = {name: get_ticker_by_name(name) for name in companies}
+    known = {name: t for name, t in tickers.items() if t}
+
+    # ✅ 상류 다운로드 1회 + stock_price $in 조회 1회를 동시에
+    jobs = {
+        "stock_price": async_db.stock_price.find({"회사명": {"$in": list(known)}}, {"_id": 0}).to_list(None),
+    }
+    if known:
+        jobs["시세"] = market_data.run_upstream(market_data.fetch_batch_daily, list(known.values()))
+    fetched = await market_data.gather_with_deadline(jobs, timeout=STOCK_DEADLINE_SECONDS)
+
+    frames = fetched.get("시세", {})
+    stock_docs = {}
+    for doc in fetched.get("stock_price", []):
+        stock_docs.setdefault(doc.get("회사명"), doc)
+
+    quotes, missing = [], []
+    for name in companies:
+        frame = frames.get(known.get(name))
+        try:
+            latest = market_data.build_latest_quote(frame.tail(2)) if frame is not None else None
+        except (TypeError, ValueError, ZeroDivisionError) as e:
+            # ✅ 거래량 NaN·전일 종가 0 등 한 종목의 이상치가 전체 응답을 막지 않도록
+            print(f"[일괄 시세 처리 오류] {name}: {e}")
+            latest = None
+        if latest is None:
+            missing.append(name)
+            continue
+
+        item = {"회사명": name, "ticker": known[name], **merge_valuation(latest, stock_docs.get(name))}
+        if req.sparkline:
+            item["sparkline"] = frame["Close"].iloc[-SPARKLINE_POINTS:].round(2).tolist()
+        quotes.append(item)
+
+    return JSONResponse(content=clean_nan({"quotes": quotes, "missing": missing}))
+
 def clean_nan(obj):
     if isinstance(obj, dict):
         return {k: clean_nan(v) for k, v in obj.items()}
@@ -856,183 +615,109 @@ def recommend(
     dividend_min: float = None,
     env_focus: bool = False,
     soc_focus: bool = False,
-    gov_focus: bool = False
+    gov_focus: bool = False,
+    sort_by: str = None,
+    order: str = Query(None, pattern="^(asc|desc)$"),
+    limit: int = Query(None, ge=1, le=1000),
+    cursor: str = None,
 ):
-    query = {}
-
-    if roe_min:
-        query["ROE(%)"] = {"$gte": roe_min}
-    if debt_max:
-        query["부채비율"] = {"$lte": debt_max}
-    if equity_ratio_min:
-        query["자기자본비율"] = {"$gte": equity_ratio_min}
-    if eps_positive:
-        query["EPS(기본)"] = {"$gt": 0}
-    elif not allow_negative_eps:
-        query["EPS(기본)"] = {"$ne": None}
-
-    # 1️⃣ 재무 조건 기반 후보 기업 추출
-    raw_candidates = list(db.finacial_statement.find(
-        query,
-        {
-            "_id": 0,
-            "회사명": 1,
-            "ROE(%)": 1,
-            "EPS(기본)": 1,
-            "부채비율": 1,
-            "자기자본비율": 1
-        }
-    ))
-
-    # 2️⃣ stock_price 병합 + PER/PBR/배당 필터 적용
-    candidates = []
-    for corp in raw_candidates:
-        stock_doc = db.stock_price.find_one({"회사명": corp["회사명"]})
-        if stock_doc:
-            per = stock_doc.get("PER")
-            pbr = stock_doc.get("PBR")
-            dividend = stock_doc.get("배당수익률(%)")
-
-            if per_max is not None and (per is None or per > per_max):
-                continue
-            if pbr_max is not None and (pbr is None or pbr > pbr_max):
-                continue
-            if dividend_min is not None and (dividend is None or dividend < dividend_min):
-                continue
+    # ✅ 메모리 스냅샷에서 모든 조건을 벡터 마스크로 평가
+    snapshot = screening_engine.get()
+    matched = snapshot.screen(
+        roe_min=roe_min,
+        esg=esg,
+        debt_max=debt_max,
+        equity_ratio_min=equity_ratio_min,
+        eps_positive=eps_positive,
+        allow_negative_eps=allow_negative_eps,
+        per_max=per_max,
+        pbr_max=pbr_max,
+        dividend_min=dividend_min,
+        env_focus=env_focus,
+        soc_focus=soc_focus,
+        gov_focus=gov_focus,
+    )
 
-            corp["PER"] = per
-            corp["PBR"] = pbr
-            corp["배당수익률(%)"] = dividend
-
-        candidates.append(corp)
-
-    # 3️⃣ ESG 등급 병합
-    enriched = []
-    for corp in candidates:
-        esg_doc = db.ESG_rate.find_one({"회사명": corp["회사명"]}, {"_id": 0})
-        if esg_doc:
-            corp["ESG등급"] = esg_doc.get("종합등급", "N/A")
-            corp["ESG_환경"] = esg_doc.get("환경", "-")
-            corp["ESG_사회"] = esg_doc.get("사회", "-")
-            corp["ESG_지배구조"] = esg_doc.get("지배구조", "-")
-        else:
-            corp["ESG등급"] = "N/A"
-            corp["ESG_환경"] = "-"
-            corp["ESG_사회"] = "-"
-            corp["ESG_지배구조"] = "-"
-        enriched.append(corp)
-
-    # 4️⃣ ESG 필터 적용
-    def grade_to_number(grade):
-        map = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
-        return map.get(str(grade).strip(), 0)
-
-    if esg:
-        esg_min_score = grade_to_number(esg)
-        enriched = [c for c in enriched if grade_to_number(c["ESG등급"]) >= esg_min_score]
-
-    # ✅ 4️⃣ ESG 세부 항목 필터 추가
-    def get_esg_score(company_name, field):
-        doc = db.ESG_rate.find_one({"회사명": company_name})
-        if not doc: return 0
-        score_map = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
-        return score_map.get(doc.get(field, ""), 0)
-
-    if env_focus:
-        enriched = [c for c in enriched if get_esg_score(c["회사명"], "환경") >= 5]
-    if soc_focus:
-        enriched = [c for c in enriched if get_esg_score(c["회사명"], "사회") >= 5]
-    if gov_focus:
-        enriched = [c for c in enriched if get_esg_score(c["회사명"], "지배구조") >= 5]
-
-    return JSONResponse(content=clean_nan(enriched))
+    # ✅ 정렬/페이지네이션 (cursor 는 다음 페이지 시작 위치)
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+    total = len(matched)
+    if sort_by:
+        values, default_order = snapshot.sort_key(sort_by, matched)
+        if values is None:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 정렬 기준: {sort_by}")
+        page = matched[screener.top_k(values, order or default_order, offset, limit)]
+    else:
+        page = matched[offset:] if limit is None else matched[offset:offset + limit]
 
-@app.get("/percentile-summary/{category}/{company_name}")
-def get_percentile_summary(category: str, company_name: str):
-    category_map = {
-        "안정성": ["부채비율", "자기자본비율", "자본유보율"],
-        "수익성": ["영업이익률", "ROE(%)", "ROA(%)", "EPS(기본)", "FCF"],
-        "성장성": ["매출액증가율", "이익증가율", "자산증가율"]
-    }
+    headers = {"X-Total-Count": str(total)}
+    if limit is not None and offset + limit < total:
+        headers["X-Next-Cursor"] = str(offset + limit)
 
-    if category not in category_map:
-        raise HTTPException(status_code=400, detail="잘못된 카테고리입니다")
+    return JSONResponse(content=clean_nan([snapshot.records[i] for i in page]), headers=headers)
 
-    keys = category_map[category]
+@app.get("/percentile-summary/{category}/{company_name}")
+def get_percentile_summary(category: str, company_name: str, year: int | None = None):
+    if category not in CATEGORY_KEYS:
+        raise HTTPException(status_code=400, detail="잘못된 카테고리입니다")
 
     # GICS 코드 가져오기
-    cat_doc = db.category.find_one({"종목명": company_name})
-    if not cat_doc or "GICS_4자리" not in cat_doc:
+    cat_doc = directory.get(company_name)
+    if not cat_doc:
         raise HTTPException(status_code=404, detail="GICS 정보 없음")
 
-    gics_code = cat_doc["GICS_4자리"]
-    peers = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-    peer_names = [p["종목명"] for p in peers]
-
-    score_map = {"우수": 3, "양호": 2, "위험": 1}
-
-    def rating_score(key, value):
-        if key == "EPS(기본)" or key == "FCF":
-            return 3 if value > 0 else 1
-        if key == "부채비율":
-            return 3 if value <= 100 else 2 if value <= 200 else 1
-        if key == "자기자본비율":
-            return 3 if value >= 50 else 2 if value >= 30 else 1
-        if key == "자본유보율":
-            return 3 if value >= 1000 else 2 if value >= 500 else 1
-        if key == "영업이익률":
-            return 3 if value >= 10 else 2 if value >= 5 else 1
-        if key == "ROE(%)":
-            return 3 if value >= 15 else 2 if value >= 7 else 1
-        if key == "ROA(%)":
-            return 3 if value >= 7 else 2 if value >= 3 else 1
-        if key == "매출액증가율" or key == "이익증가율":
-            return 3 if value >= 10 else 2 if value >= 3 else 1
-        if key == "자산증가율":
-            return 3 if value >= 10 else 2 if value >= 5 else 1
-        return None
+    # ✅ 미리 만든 업종×연도별 점수 인덱스에서 순위 조회 (기본: 최신 연도)
+    index = percentile_index.get()
+    key = ("category", category)
+    if year is None:
+        year = index.latest_year(company_name, key)
 
-    def calc_score(doc):
-        scores = []
-        for key in keys:
-            val = doc.get(key)
-            if isinstance(val, (int, float)):
-                score = rating_score(key, val)
-                if score:
-                    scores.append(score)
-        if scores:
-            return round(sum(scores) / len(scores), 4)
-        return None
-
-    peer_docs = list(db.finacial_statement.find({"회사명": {"$in": peer_names}}))
-    scored_peers = [(doc["회사명"], calc_score(doc)) for doc in peer_docs if calc_score(doc) is not None]
-
-    scored_peers = sorted(scored_peers, key=lambda x: x[1], reverse=True)
-    total = len(scored_peers)
-
-    target_score = calc_score(db.finacial_statement.find_one({"회사명": company_name}))
+    target_score = index.value(company_name, year, key)
     if target_score is None:
         raise HTTPException(status_code=404, detail="해당 기업의 점수를 계산할 수 없음")
 
-    rank = next((i for i, (name, score) in enumerate(scored_peers) if name == company_name), None)
-
-    if rank is None:
+    ranked = index.rank(cat_doc["GICS_4자리"], year, key, target_score)
+    if ranked is None:
         raise HTTPException(status_code=404, detail="해당 기업이 업종 내 순위에 없음")
 
-    percentile = round((total - rank) / total * 100, 2)
+    rank, total, percentile = ranked
 
     return {
         "company_name": company_name,
         "category": category,
+        "year": year,
         "score": target_score,
-        "rank": rank + 1,
+        "rank": rank,
         "total": total,
         "avg_percentile": percentile
     }
 
-@app.get("/company/{company_name}/sharp")
-def get_sharp_timeseries(company_name: str):
-    cursor = db.Sharp.find(
+# ✅ 안정성/수익성/성장성 점수·순위를 한 번에 (카테고리별 /percentile-summary 호출 대체)
+@app.get("/scorecard/{company_name}")
+def get_scorecard(company_name: str, year: int | None = None):
+    cat_doc = directory.get(company_name)
+    if not cat_doc:
+        raise HTTPException(status_code=404, detail="GICS 정보 없음")
+
+    categories = percentile_index.get().category_ranks(company_name, cat_doc["GICS_4자리"], year)
+    if not categories:
+        raise HTTPException(status_code=404, detail="해당 기업의 점수를 계산할 수 없음")
+
+    return {
+        "company_name": company_name,
+        "GICS_4자리": cat_doc["GICS_4자리"],
+        "업종명": cat_doc.get("업종명"),
+        "categories": categories
+    }
+
+
+async def load_sharp(company_name):
+    cursor = async_db.Sharp.find(
         {"회사명": company_name},
         {
             "_id": 0,
@@ -1043,7 +728,7 @@ def get_sharp_timeseries(company_name: str):
             "개별종목 수익률(%) - 업종 수익률(%)": 1
         }
     )
-    data = sorted(cursor, key=lambda x: x.get("연도"))
+    data = sorted(await cursor.to_list(None), key=lambda x: x.get("연도"))
 
     # ✅ 명시적으로 필드명 리맵
     result = []
@@ -1055,70 +740,251 @@ def get_sharp_timeseries(company_name: str):
             "개별 종목 수익률 - 종합지수 수익률": doc.get("개별 종목 수익률(%) - 종합지수 수익률(%)"),
             "업종별 수익률 - 종합지수 수익률": doc.get("개별종목 수익률(%) - 업종 수익률(%)"),
         })
+    return result
 
+
+@app.get("/company/{company_name}/sharp")
+async def get_sharp_timeseries(company_name: str):
+    result = await load_sharp(company_name)
     if not result:
         raise HTTPException(status_code=404, detail="Sharp 시계열 데이터를 찾을 수 없습니다.")
 
     return result
 
-@app.get("/percentile/{metric}/{company_name}")
-def get_percentile(metric: str, company_name: str):
-    metric_map = {
-        "ROE": "ROE(%)",
-        "ROA": "ROA(%)",
-        "EPS": "EPS(기본)",
-        "FCF": "FCF",
-        "부채비율": "부채비율",
-        "자기자본비율": "자기자본비율",
-        "자본유보율": "자본유보율",
-        "영업이익률": "영업이익률",
-        "매출액증가율": "매출액증가율",
-        "이익증가율": "이익증가율",
-        "자산증가율": "자산증가율"
-    }
-
-    field = metric_map.get(metric, metric)
-
-    cat_doc = db.category.find_one({"종목명": company_name})
-    if not cat_doc or "GICS_4자리" not in cat_doc:
-        raise HTTPException(status_code=404, detail="GICS 정보 없음")
+PERCENTILE_METRICS = {
+    "ROE": "ROE(%)",
+    "ROA": "ROA(%)",
+    "EPS": "EPS(기본)",
+    "FCF": "FCF",
+    "부채비율": "부채비율",
+    "자기자본비율": "자기자본비율",
+    "자본유보율": "자본유보율",
+    "영업이익률": "영업이익률",
+    "매출액증가율": "매출액증가율",
+    "이익증가율": "이익증가율",
+    "자산증가율": "자산증가율"
+}
 
-    gics_code = cat_doc["GICS_4자리"]
-    peers = db.category.find({"GICS_4자리": gics_code}, {"종목명": 1})
-    peer_names = [p["종목명"] for p in peers]
 
-    peer_docs = list(db.finacial_statement.find({"회사명": {"$in": peer_names}}))
+@app.get("/percentile/{metric}/{company_name}")
+def get_percentile(metric: str, company_name: str, year: int | None = None):
+    field = PERCENTILE_METRICS.get(metric, metric)
+    if field not in PERCENTILE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 지표: {metric}")
 
-    scored_peers = [
-        (doc["회사명"], doc.get(field))
-        for doc in peer_docs
-        if isinstance(doc.get(field), (int, float))
-    ]
-    scored_peers.sort(key=lambda x: x[1], reverse=True)
-    total = len(scored_peers)
+    cat_doc = directory.get(company_name)
+    if not cat_doc:
+        raise HTTPException(status_code=404, detail="GICS 정보 없음")
 
-    target_doc = db.finacial_statement.find_one({"회사명": company_name})
-    target_value = target_doc.get(field) if target_doc else None
+    # ✅ 미리 만든 업종×연도별 정렬 인덱스에서 순위 조회 (기본: 최신 연도)
+    index = percentile_index.get()
+    if year is None:
+        year = index.latest_year(company_name, field)
 
-    if target_value is None or not isinstance(target_value, (int, float)):
+    target_value = index.value(company_name, year, field)
+    if target_value is None:
         raise HTTPException(status_code=404, detail="해당 기업 값 없음")
 
-    rank = next((i for i, (name, value) in enumerate(scored_peers) if name == company_name), None)
-
-    if rank is None:
+    ranked = index.rank(cat_doc["GICS_4자리"], year, field, target_value)
+    if ranked is None:
         raise HTTPException(status_code=404, detail="순위 계산 실패")
 
-    percentile = round((total - rank) / total * 100, 2)
+    rank, total, percentile = ranked
 
     return {
         "company_name": company_name,
         "metric": metric,
+        "year": year,
         "value": target_value,
-        "rank": rank + 1,
+        "rank": rank,
         "total": total,
         "percentile": percentile
     }
 
+# ✅ 저장된 일봉으로 기간별 위험·수익 지표 계산
+@app.get("/company/{company_name}/risk")
+async def get_company_risk(
+    company_name: str,
+    start: str | None = None,
+    end: str | None = None,
+    freq: str = Query("D", pattern="^(D|W|M)$"),
+):
+    ticker = get_ticker_by_name(company_name)
+    if not ticker:
+        raise HTTPException(status_code=404, detail="해당 회사명을 찾을 수 없습니다.")
+    try:
+        for value in (start, end):
+            if value:
+                np.datetime64(value, "D")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="날짜 형식은 YYYY-MM-DD 입니다.")
+
+    code = ticker.replace(".KS", "")
+    profile = directory.get(company_name) or {}
+    peer_codes = [
+        t.replace(".KS", "")
+        for t in (get_ticker_by_name(p) for p in profile.get("peers", []) if p != company_name)
+        if t
+    ]
+
+    # ✅ 종목·시장·업종 일봉을 동시에 최신화 (마감 시간 안에 끝난 것만 반영)
+    symbols = [code, risk.MARKET_SYMBOL] + peer_codes
+    await market_data.gather_with_deadline(
+        {symbol: market_data.run_upstream(price_store.refresh, symbol) for symbol in symbols},
+        timeout=STOCK_DEADLINE_SECONDS,
+    )
+
+    result = await asyncio.to_thread(risk.risk_cache.get, code, peer_codes, start, end, freq)
+    if result is None:
+        raise HTTPException(status_code=404, detail="주가 데이터를 찾을 수 없습니다.")
+
+    return {
+        "company_name": company_name,
+        "ticker": ticker,
+        "GICS_4자리": profile.get("GICS_4자리"),
+        **result
+    }
+
+
+# ✅ 기술적 지표 시계열 (SMA/EMA/변동성/RSI/낙폭)
+def build_indicator_series(code, specs, period, max_points=None):
+    try:
+        price_store.refresh(code)
+    except Exception as e:
+        print(f"[일봉 동기화 오류] {e}")
+
+    # ✅ 이동 구간 계산을 위해 전체 이력으로 계산한 뒤 요청 기간만 잘라서 반환
+    data = price_store.load(code)
+    if data is None or len(data["date"]) == 0:
+        return None
+    dates, closes = data["date"], data["Close"]
+
+    series = {
+        indicators.spec_key(name, param): indicator_cache.series(code, name, param, dates, closes)
+        for name, param in specs
+    }
+
+    start = np.datetime64(datetime.now().date() - STOCK_PERIODS[period], "D")
+    idx = np.arange(int(np.searchsorted(dates, start, side="left")), len(dates))
+    if max_points:
+        idx = idx[timeseries.lttb_indices(dates[idx].astype("int64"), closes[idx], max_points)]
+
+    return {
+        "dates": np.datetime_as_string(dates[idx], unit="D").tolist(),
+        "close": clean_nan(closes[idx].tolist()),
+        "series": {key: clean_nan(values[idx].tolist()) for key, values in series.items()}
+    }
+
+
+@app.get("/company/{company_name}/indicators")
+async def get_company_indicators(
+    company_name: str,
+    indicators_param: str = Query("sma:20,sma:60,rsi:14", alias="indicators"),
+    period: str = "1년",
+    max_points: int | None = Query(None, ge=3),
+):
+    if period not in STOCK_PERIODS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 기간: {period}")
+    try:
+        specs = indicators.parse_specs(indicators_param)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not specs:
+        raise HTTPException(status_code=400, detail="지표를 하나 이상 지정하세요")
+
+    ticker = get_ticker_by_name(company_name)
+    if not ticker:
+        raise HTTPException(status_code=404, detail="해당 회사명을 찾을 수 없습니다.")
+
+    result = await market_data.run_upstream(
+        build_indicator_series, ticker.replace(".KS", ""), specs, period, max_points
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="주가 데이터를 찾을 수 없습니다.")
+
+    return {"company_name": company_name, "ticker": ticker, "period": period, **result}
+
+
+# ✅ 시장 상승/하락/거래대금 상위 종목 (스냅샷에서 바로 응답)
+@app.get("/market/movers")
+def get_market_movers(limit: int = Query(10, ge=1, le=MOVERS_LIMIT)):
+    movers = market_snapshot.movers(limit)
+    if movers is None:
+        raise HTTPException(status_code=503, detail="시세 스냅샷을 준비 중입니다.")
+    return movers
+
+
+# ✅ GICS 업종별 기간 수익률 히트맵 (로컬 일봉 저장소 기준)
+@app.get("/sectors/heatmap")
+async def get_sector_heatmap(
+    period: str = "1년",
+    weighting: str = Query("equal", pattern="^(equal|cap)$"),
+):
+    if period not in STOCK_PERIODS:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 기간: {period}")
+
+    result = await asyncio.to_thread(
+        heatmap_cache.get, period, STOCK_PERIODS[period].days, ticker_map, weighting
+    )
+    return {"period": period, "weighting": weighting, **result}
+
+
+# ✅ 회사 종합 화면 (필요한 항목만 골라 동시에 조회)
+OVERVIEW_SECTIONS = ("financials", "esg", "sharp", "percentiles")
+OVERVIEW_DEADLINE_SECONDS = float(os.getenv("OVERVIEW_DEADLINE_SECONDS", "8"))
+
+
+def load_percentiles(company_name, gics_code):
+    index = percentile_index.get()
+    metrics = {}
+    for metric, field in PERCENTILE_METRICS.items():
+        ranked = index.key_rank(company_name, gics_code, field)
+        if ranked is not None:
+            metrics[metric] = ranked
+    return {
+        "categories": index.category_ranks(company_name, gics_code),
+        "metrics": metrics
+    }
+
+
+@app.get("/company/{company_name}/overview")
+async def get_company_overview(company_name: str, include: str = ",".join(OVERVIEW_SECTIONS)):
+    sections = list(dict.fromkeys(s.strip() for s in include.split(",") if s.strip()))
+    unknown = [s for s in sections if s not in OVERVIEW_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 항목: {unknown}")
+
+    # ✅ 회사·업종 정보는 한 번만 확인해서 모든 항목이 공유
+    cat_doc = directory.get(company_name)
+
+    jobs = {}
+    if "financials" in sections:
+        jobs["financials"] = load_financials(company_name)
+    if "sharp" in sections:
+        jobs["sharp"] = load_sharp(company_name)
+    if cat_doc is not None:
+        if "esg" in sections and cat_doc["업종명"] is not None:
+            jobs["esg"] = load_nonfinancials(company_name, cat_doc)
+        if "percentiles" in sections:
+            jobs["percentiles"] = asyncio.to_thread(load_percentiles, company_name, cat_doc["GICS_4자리"])
+
+    fetched = await market_data.gather_with_deadline(jobs, timeout=OVERVIEW_DEADLINE_SECONDS)
+    if cat_doc is None and not any(fetched.values()):
+        suggestions = company_search.suggest(company_name)
+        raise HTTPException(status_code=404, detail=f"Company not found. Did you mean: {suggestions}")
+
+    result = {
+        "company_name": company_name,
+        "GICS_4자리": cat_doc["GICS_4자리"] if cat_doc else None,
+        "업종명": cat_doc["업종명"] if cat_doc else None
+    }
+    for section in sections:
+        result[section] = fetched.get(section)
+    result["missing"] = [section for section in sections if not result[section]]
+
+    return JSONResponse(content=clean_nan(result))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,335 @@
+import asyncio
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ✅ 상류(yfinance/FDR) 블로킹 호출 전용 스레드 풀 (이벤트 루프와 기본 스레드 풀을 막지 않음)
+UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "32"))
+upstream_executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix="upstream")
+
+# ✅ 연속 실패 몇 번이면 차단할지 / 차단 후 재시도까지 대기(초)
+BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("UPSTREAM_BREAKER_COOLDOWN", "60"))
+
+# ✅ 시세 캐시: soft TTL 이 지나면 기존 값을 주면서 백그라운드 갱신, hard TTL 이 지나면 버림 (초)
+UPSTREAM_CACHE_SIZE = int(os.getenv("UPSTREAM_CACHE_SIZE", "4096"))
+INTRADAY_TTL = (60, 60 * 30)
+DAILY_TTL = (300, 60 * 60 * 24)
+
+
+class UpstreamUnavailable(Exception):
+    pass
+
+
+# ✅ 상류별 연속 실패가 쌓이면 일정 시간 호출을 막고, 이후 한 번만 시험 호출
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN_SECONDS):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self._trial = 0, None, False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def state(self):
+        if self.opened_at is None:
+            return {"state": "closed", "failures": self.failures}
+        retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {
+            "state": "half_open" if retry_in == 0 else "open",
+            "failures": self.failures,
+            "retry_in": round(retry_in, 1),
+        }
+
+
+class UpstreamStats:
+    def __init__(self):
+        self._counters = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def record(self, source, event):
+        with self._lock:
+            self._counters.setdefault(source, Counter())[event] += 1
+
+    def breaker(self, source):
+        with self._lock:
+            return self._breakers.setdefault(source, CircuitBreaker())
+
+    def report(self):
+        with self._lock:
+            sources = sorted(set(self._counters) | set(self._breakers))
+        return {
+            source: {
+                **{event: self._counters.get(source, Counter())[event]
+                   for event in ("hits", "stale", "misses", "errors", "short_circuits", "refreshes")},
+                "breaker": self.breaker(source).state(),
+            }
+            for source in sources
+        }
+
+
+upstream_stats = UpstreamStats()
+
+
+def guarded_call(source, fn, *args):
+    # ✅ 차단 중이면 상류를 부르지 않고 바로 실패
+    breaker = upstream_stats.breaker(source)
+    if not breaker.allow():
+        upstream_stats.record(source, "short_circuits")
+        raise UpstreamUnavailable(f"{source} 호출 차단 중 (연속 실패 {breaker.failures}회)")
+    try:
+        result = fn(*args)
+    except Exception:
+        upstream_stats.record(source, "errors")
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def revalidate(source, key, fn, *args):
+    # ✅ 같은 키의 백그라운드 갱신은 하나만
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            upstream_stats.record(source, "refreshes")
+            fn(*args)
+        except Exception as e:
+            print(f"⚠️ [{source}] 백그라운드 갱신 실패 {key}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    upstream_executor.submit(run)
+
+
+class StaleWhileRevalidateCache:
+    def __init__(self, maxsize=UPSTREAM_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key, ttl):
+        soft_ttl, hard_ttl = ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss"
+            self._entries.move_to_end(key)
+        age = time.monotonic() - entry[1]
+        if age < soft_ttl:
+            return entry[0], "hits"
+        if age < hard_ttl:
+            return entry[0], "stale"
+        return None, "miss"
+
+    def store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def load(self, source, key, fn, *args):
+        # ✅ 캐시를 거치지 않고 상류에서 받아 캐시에 저장 (주기 갱신 작업용)
+        value = guarded_call(source, fn, *args)
+        self.store(key, value)
+        return value
+
+    def get(self, source, key, ttl, fn, *args):
+        value, state = self.lookup(key, ttl)
+        if state == "miss":
+            upstream_stats.record(source, "misses")
+            return self.load(source, key, fn, *args)
+
+        upstream_stats.record(source, state)
+        if state == "stale":
+            revalidate(source, key, self.load, source, key, fn, *args)
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+
+upstream_cache = StaleWhileRevalidateCache()
+
+
+# ✅ pandas/yfinance 는 첫 상류 호출 때 import (서버 기동 시간 단축)
+def _yf():
+    import yfinance
+    return yfinance
+
+
+async def run_upstream(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(upstream_executor, fn, *args)
+
+
+async def gather_with_deadline(jobs, timeout):
+    # ✅ jobs: {이름: 코루틴} → 마감 시간 안에 끝난 결과만 반환
+    if not jobs:
+        # asyncio.wait 는 빈 집합이면 ValueError
+        return {}
+    tasks = {asyncio.ensure_future(coro): name for name, coro in jobs.items()}
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+        print(f"[{tasks[task]} 시간 초과] {timeout}s 안에 응답 없음")
+
+    results = {}
+    for task in done:
+        try:
+            results[tasks[task]] = task.result()
+        except Exception as e:
+            print(f"[{tasks[task]} 처리 오류] {e}")
+    return results
+
+
+def _fetch_intraday(ticker):
+    df = _yf().Ticker(ticker).history(period="1d", interval="5m")
+    df.index = df.index.tz_localize(None)
+    return df
+
+
+# ✅ 요청 처리 경로는 stale-while-revalidate, 주기 갱신 작업(refresh=True)은 항상 상류에서 새로 받음
+def fetch_intraday(ticker, refresh=False):
+    if refresh:
+        return upstream_cache.load("yfinance", ("intraday", ticker), _fetch_intraday, ticker)
+    return upstream_cache.get("yfinance", ("intraday", ticker), INTRADAY_TTL, _fetch_intraday, ticker)
+
+
+def _fetch_recent_daily(ticker, period="2d"):
+    import pandas as pd
+
+    df = _yf().Ticker(ticker).history(period=period, interval="1d")
+    df.index = pd.to_datetime(df.index)
+    return df.sort_index()
+
+
+def fetch_recent_daily(ticker, period="2d", refresh=False):
+    if refresh:
+        return upstream_cache.load("yfinance", ("daily", ticker, period), _fetch_recent_daily, ticker, period)
+    return upstream_cache.get("yfinance", ("daily", ticker, period), DAILY_TTL, _fetch_recent_daily, ticker, period)
+
+
+def build_latest_quote(df_latest):
+    # ✅ 최신 시세 정보 (yfinance 최근 2일)
+    if len(df_latest) < 2:
+        return None
+
+    current_price = float(df_latest["Close"].iloc[-1])
+    prev_price = float(df_latest["Close"].iloc[-2])
+    change = current_price - prev_price
+    change_rate = (change / prev_price) * 100
+    value_traded = current_price * float(df_latest["Volume"].iloc[-1])
+
+    latest = df_latest.iloc[-1]
+    return {
+        "open": float(latest["Open"]),
+        "high": float(latest["High"]),
+        "low": float(latest["Low"]),
+        "volume": int(latest["Volume"]),
+        "current": current_price,
+        "change": round(change, 2),
+        "changeRate": round(change_rate, 2),
+        "valueTraded": int(value_traded),
+    }
+
+
+def _download_batch(tickers, period="1mo"):
+    # ✅ 여러 티커를 yf.download 한 번으로 조회 → {티커: DataFrame}
+    import pandas as pd
+
+    df = _yf().download(
+        list(tickers), period=period, interval="1d",
+        group_by="ticker", auto_adjust=True, threads=True, progress=False,
+    )
+    if df is None or df.empty:
+        return {}
+
+    frames = {}
+    for ticker in tickers:
+        if isinstance(df.columns, pd.MultiIndex):
+            if ticker not in df.columns.get_level_values(0):
+                continue
+            frame = df[ticker]
+        else:
+            frame = df
+        frame = frame.dropna(subset=["Close"])
+        if not frame.empty:
+            frame.index = pd.to_datetime(frame.index)
+            frames[ticker] = frame.sort_index()
+    return frames
+
+
+def _store_batch(tickers, period):
+    frames = guarded_call("yfinance", _download_batch, tickers, period)
+    for ticker, frame in frames.items():
+        upstream_cache.store(("batch", ticker, period), frame)
+    return frames
+
+
+def fetch_batch_daily(tickers, period="1mo", refresh=False):
+    if refresh:
+        # ✅ 호출 측(시장 스냅샷)이 배치 간격을 조절하므로 백그라운드 갱신 없이 바로 받음
+        return _store_batch(list(tickers), period)
+
+    # ✅ 티커별로 캐시 확인 → 없는 티커만 한 번에 받고, 오래된 티커는 백그라운드로 갱신
+    frames, stale, missing = {}, [], []
+    for ticker in tickers:
+        frame, state = upstream_cache.lookup(("batch", ticker, period), DAILY_TTL)
+        if state == "miss":
+            missing.append(ticker)
+            continue
+        frames[ticker] = frame
+        if state == "stale":
+            stale.append(ticker)
+
+    if len(frames) > len(stale):
+        upstream_stats.record("yfinance", "hits")
+    if stale:
+        upstream_stats.record("yfinance", "stale")
+        revalidate("yfinance", ("batch", tuple(stale), period), _store_batch, stale, period)
+
+    if missing:
+        upstream_stats.record("yfinance", "misses")
+        try:
+            frames.update(_store_batch(missing, period))
+        except Exception as e:
+            # ✅ 캐시에 있던 티커라도 먼저 응답
+            if not frames:
+                raise
+            print(f"⚠️ [yfinance] 일괄 조회 실패 ({len(missing)}개 누락): {e}")
+    return frames
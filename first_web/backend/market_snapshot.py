@@ -0,0 +1,179 @@
+import asyncio
+import math
+import os
+import time
+from datetime import datetime
+
+import market_data
+from price_store import price_store
+
+# ✅ 전 종목 시세 스냅샷 갱신 주기(초) / 배치당 티커 수 / 배치 사이 대기(초, 상류 호출 제한)
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("MARKET_SNAPSHOT_SECONDS", "600"))
+BATCH_SIZE = int(os.getenv("MARKET_SNAPSHOT_BATCH_SIZE", "50"))
+BATCH_PAUSE_SECONDS = float(os.getenv("MARKET_SNAPSHOT_BATCH_PAUSE", "2"))
+
+# ✅ 전 종목 일봉 저장소 동기화 시 종목 사이 대기(초) (히트맵 등 로컬 일봉 기반 기능용)
+WARM_PAUSE_SECONDS = float(os.getenv("MARKET_SNAPSHOT_WARM_PAUSE", "0.5"))
+
+# ✅ 순위별로 미리 잘라 두는 최대 개수
+MOVERS_LIMIT = 50
+
+
+def _local_quote(ticker):
+    # ✅ 상류 배치에서 빠진 종목은 로컬 일봉 저장소 마지막 2거래일로 대체
+    data = price_store.load(ticker.replace(".KS", ""), columns=("Open", "High", "Low", "Close", "Volume"))
+    if data is None or len(data["date"]) < 2:
+        return None, None
+
+    current, prev = float(data["Close"][-1]), float(data["Close"][-2])
+    volume = float(data["Volume"][-1])
+    if not prev or math.isnan(prev) or math.isnan(current) or math.isnan(volume):
+        return None, None
+    quote = {
+        "open": float(data["Open"][-1]),
+        "high": float(data["High"][-1]),
+        "low": float(data["Low"][-1]),
+        "volume": int(volume),
+        "current": current,
+        "change": round(current - prev, 2),
+        "changeRate": round((current - prev) / prev * 100, 2),
+        "valueTraded": int(current * volume),
+    }
+    return quote, str(data["date"][-1])
+
+
+def build_rankings(rows, limit=MOVERS_LIMIT):
+    return {
+        "gainers": sorted(
+            (r for r in rows if r["changeRate"] > 0), key=lambda r: r["changeRate"], reverse=True
+        )[:limit],
+        "losers": sorted(
+            (r for r in rows if r["changeRate"] < 0), key=lambda r: r["changeRate"]
+        )[:limit],
+        "value_traded": sorted(rows, key=lambda r: r["valueTraded"], reverse=True)[:limit],
+    }
+
+
+class MarketSnapshot:
+    def __init__(self, interval=SNAPSHOT_INTERVAL_SECONDS, batch_size=BATCH_SIZE, batch_pause=BATCH_PAUSE_SECONDS,
+                 warm_pause=WARM_PAUSE_SECONDS):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.warm_pause = warm_pause
+        self.universe = {}
+        self.snapshot = None
+        self._task = None
+        self._warm_task = None
+
+    async def _fetch_batches(self, tickers):
+        quotes = {}
+        for i in range(0, len(tickers), self.batch_size):
+            if i:
+                await asyncio.sleep(self.batch_pause)
+            batch = tickers[i:i + self.batch_size]
+            try:
+                frames = await market_data.run_upstream(market_data.fetch_batch_daily, batch, "5d", True)
+            except Exception as e:
+                print(f"⚠️ [market_snapshot] 배치 조회 실패 ({len(batch)}개): {e}")
+                continue
+
+            for ticker, frame in frames.items():
+                try:
+                    quote = market_data.build_latest_quote(frame)
+                except (TypeError, ValueError, ZeroDivisionError):
+                    quote = None
+                if quote is not None:
+                    quotes[ticker] = (quote, frame.index[-1].strftime("%Y-%m-%d"))
+        return quotes
+
+    async def refresh(self):
+        started = time.monotonic()
+        tickers = sorted(self.universe)
+        quotes = await self._fetch_batches(tickers)
+
+        fallback = 0
+        for ticker in tickers:
+            if ticker in quotes:
+                continue
+            quote, date = await asyncio.to_thread(_local_quote, ticker)
+            if quote is not None:
+                quotes[ticker] = (quote, date)
+                fallback += 1
+
+        rows = [
+            {"company_name": self.universe[ticker], "ticker": ticker, "date": date, **quote}
+            for ticker, (quote, date) in quotes.items()
+        ]
+        # ✅ 순위는 갱신 시점에 한 번만 계산하고 스냅샷째로 교체
+        self.snapshot = {
+            "as_of": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "universe": len(tickers),
+            "count": len(rows),
+            **build_rankings(rows),
+        }
+        print(
+            f"✅ [market_snapshot] {len(rows)}/{len(tickers)}개 종목 갱신 "
+            f"(로컬 대체 {fallback}개, {time.monotonic() - started:.2f}s)"
+        )
+        return self.snapshot
+
+    def movers(self, limit):
+        if self.snapshot is None:
+            return None
+        return {
+            **self.snapshot,
+            "gainers": self.snapshot["gainers"][:limit],
+            "losers": self.snapshot["losers"][:limit],
+            "value_traded": self.snapshot["value_traded"][:limit],
+        }
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ [market_snapshot] 갱신 실패: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def warm_price_store(self):
+        # ✅ 조회된 적 없는 종목도 로컬 일봉 저장소에 채움 (이미 최신이면 상류 호출 없음)
+        synced = 0
+        for ticker in sorted(self.universe):
+            try:
+                fetched = await market_data.run_upstream(price_store.sync, ticker.replace(".KS", ""))
+            except market_data.UpstreamUnavailable as e:
+                print(f"⚠️ [market_snapshot] 일봉 동기화 중단: {e}")
+                break
+            except Exception as e:
+                print(f"⚠️ [market_snapshot] {ticker} 일봉 동기화 실패: {e}")
+                continue
+            if fetched:
+                synced += 1
+                await asyncio.sleep(self.warm_pause)
+        print(f"✅ [market_snapshot] 일봉 저장소 동기화 {synced}/{len(self.universe)}개")
+
+    async def _warm_loop(self):
+        while True:
+            try:
+                await self.warm_price_store()
+            except Exception as e:
+                print(f"⚠️ [market_snapshot] 일봉 동기화 실패: {e}")
+            await asyncio.sleep(price_store.sync_interval)
+
+    def start(self, ticker_map):
+        # ✅ ticker_map: {회사명: 티커} → {티커: 회사명}
+        self.universe = {ticker: name for name, ticker in ticker_map.items()}
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+        if self._warm_task is None:
+            self._warm_task = asyncio.ensure_future(self._warm_loop())
+
+    async def stop(self):
+        for task in (self._task, self._warm_task):
+            if task is not None:
+                task.cancel()
+        self._task = self._warm_task = None
+
+
+market_snapshot = MarketSnapshot()
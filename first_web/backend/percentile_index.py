@@ -0,0 +1,163 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from database import db
+from company_directory import directory
+from snapshots import VersionedSnapshot
+import industry_stats
+
+# ✅ 업종 내 백분위를 계산하는 재무 지표
+PERCENTILE_FIELDS = industry_stats.SOURCE_FIELDS["finacial_statement"]
+
+CATEGORY_KEYS = {
+    "안정성": ["부채비율", "자기자본비율", "자본유보율"],
+    "수익성": ["영업이익률", "ROE(%)", "ROA(%)", "EPS(기본)", "FCF"],
+    "성장성": ["매출액증가율", "이익증가율", "자산증가율"]
+}
+
+
+# ✅ 지표별 등급 규칙: 위에서부터 처음 만족하는 조건의 점수, 아무것도 아니면 기본 점수
+RATING_RULES = {
+    "EPS(기본)": ([(">", 0, 3)], 1),
+    "FCF": ([(">", 0, 3)], 1),
+    "부채비율": ([("<=", 100, 3), ("<=", 200, 2)], 1),
+    "자기자본비율": ([(">=", 50, 3), (">=", 30, 2)], 1),
+    "자본유보율": ([(">=", 1000, 3), (">=", 500, 2)], 1),
+    "영업이익률": ([(">=", 10, 3), (">=", 5, 2)], 1),
+    "ROE(%)": ([(">=", 15, 3), (">=", 7, 2)], 1),
+    "ROA(%)": ([(">=", 7, 3), (">=", 3, 2)], 1),
+    "매출액증가율": ([(">=", 10, 3), (">=", 3, 2)], 1),
+    "이익증가율": ([(">=", 10, 3), (">=", 3, 2)], 1),
+    "자산증가율": ([(">=", 10, 3), (">=", 5, 2)], 1),
+}
+
+_COMPARE = {">": np.greater, ">=": np.greater_equal, "<=": np.less_equal}
+
+
+# ✅ 지표 값 배열 → 등급 점수 배열 (값이 없으면 NaN)
+def rate(key, values):
+    conditions, default = RATING_RULES[key]
+    values = np.asarray(values, dtype="float64")
+    scores = np.select(
+        [_COMPARE[op](values, threshold) for op, threshold, _ in conditions],
+        [score for _, _, score in conditions],
+        default,
+    ).astype("float64")
+    scores[np.isnan(values)] = np.nan
+    return scores
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value)
+
+
+# ✅ {지표: 값 배열} → {카테고리: 점수 배열}. 카테고리 점수는 값이 있는 지표 등급의 평균
+def category_scores(columns):
+    scores = {}
+    for category, keys in CATEGORY_KEYS.items():
+        rated = np.vstack([rate(key, columns[key]) for key in keys])
+        counts = np.sum(~np.isnan(rated), axis=0)
+        totals = np.nansum(rated, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores[category] = np.where(counts > 0, np.round(totals / np.maximum(counts, 1), 4), np.nan)
+    return scores
+
+
+# ✅ (GICS_4자리, 연도, 지표) → 정렬된 값 배열. 순위는 이진 탐색으로 O(log n)
+class PercentileIndex:
+    def __init__(self, company_to_gics, rows):
+        keys, gics_codes = [], []
+        columns = {field: [] for field in PERCENTILE_FIELDS}
+        seen = set()
+
+        for row in rows:
+            company = row.get("회사명")
+            gics_code = company_to_gics.get(company)
+            year = industry_stats._to_year(row.get("연도"))
+            # ✅ 회사×연도당 한 행만 사용 (같은 회사가 여러 번 순위에 오르지 않도록)
+            if gics_code is None or year is None or (company, year) in seen:
+                continue
+            seen.add((company, year))
+            keys.append((company, year))
+            gics_codes.append(gics_code)
+            for field in PERCENTILE_FIELDS:
+                value = row.get(field)
+                columns[field].append(float(value) if _is_number(value) else np.nan)
+
+        columns = {field: np.asarray(values, dtype="float64") for field, values in columns.items()}
+        metrics = dict(columns)
+        for category, scores in category_scores(columns).items():
+            metrics[("category", category)] = scores
+
+        self.company_values = {key: {} for key in keys}
+        buckets = defaultdict(list)
+        for metric, values in metrics.items():
+            for i in np.flatnonzero(~np.isnan(values)):
+                company, year = keys[i]
+                value = float(values[i])
+                self.company_values[(company, year)][metric] = value
+                buckets[(gics_codes[i], year, metric)].append(value)
+
+        self.sorted_values = {key: np.sort(np.asarray(v, dtype="float64")) for key, v in buckets.items()}
+        self.company_years = defaultdict(list)
+        for company, year in sorted(self.company_values):
+            self.company_years[company].append(year)
+
+    def latest_year(self, company, key):
+        for year in reversed(self.company_years.get(company, [])):
+            if key in self.company_values[(company, year)]:
+                return year
+        return None
+
+    def value(self, company, year, key):
+        return self.company_values.get((company, year), {}).get(key)
+
+    def rank(self, gics_code, year, key, target):
+        values = self.sorted_values.get((gics_code, year, key))
+        if values is None or len(values) == 0:
+            return None
+        total = len(values)
+        higher = total - int(np.searchsorted(values, target, side="right"))
+        percentile = round((total - higher) / total * 100, 2)
+        return higher + 1, total, percentile
+
+
+    def key_rank(self, company, gics_code, key, year=None):
+        year = self.latest_year(company, key) if year is None else year
+        value = self.value(company, year, key)
+        ranked = None if value is None else self.rank(gics_code, year, key, value)
+        if ranked is None:
+            return None
+        rank, total, percentile = ranked
+        return {"year": year, "value": value, "rank": rank, "total": total, "percentile": percentile}
+
+    def category_ranks(self, company, gics_code, year=None):
+        results = {}
+        for category in CATEGORY_KEYS:
+            ranked = self.key_rank(company, gics_code, ("category", category), year)
+            if ranked is None:
+                continue
+            results[category] = {
+                "category": category,
+                "year": ranked["year"],
+                "score": ranked["value"],
+                "rank": ranked["rank"],
+                "total": ranked["total"],
+                "avg_percentile": ranked["percentile"]
+            }
+        return results
+
+
+def build_index():
+    company_to_gics = {
+        name: gics_code
+        for gics_code, names in directory.industries(wait=True).items()
+        for name in names
+    }
+    projection = {"_id": 0, "회사명": 1, "연도": 1, **{f: 1 for f in PERCENTILE_FIELDS}}
+    return PercentileIndex(company_to_gics, db.finacial_statement.find({}, projection))
+
+
+percentile_index = VersionedSnapshot("percentile_index", ("finacial_statement", "category"), build_index)
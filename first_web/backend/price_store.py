@@ -0,0 +1,169 @@
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import market_data
+
+# ✅ 종목별 일봉 저장소: 컬럼마다 .npy 파일 하나 (메모리 맵으로 필요한 구간만 읽음)
+PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "price_store")
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# ✅ 최초 적재 기간 / 상류(FDR) 재확인 주기(초)
+HISTORY_DAYS = 365 * 10 + 10
+SYNC_INTERVAL_SECONDS = int(os.getenv("PRICE_STORE_SYNC_SECONDS", "3600"))
+# ✅ 이 시간 안의 저장 데이터는 바로 응답하고 백그라운드로 동기화, 넘으면 동기화 후 응답(초)
+STALE_SECONDS = int(os.getenv("PRICE_STORE_STALE_SECONDS", str(60 * 60 * 24 * 3)))
+
+
+class PriceStore:
+    def __init__(self, root=PRICE_STORE_DIR, sync_interval=SYNC_INTERVAL_SECONDS, stale_seconds=STALE_SECONDS):
+        self.root = root
+        self.sync_interval = sync_interval
+        self.stale_seconds = stale_seconds
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._maps = {}
+
+    def _lock(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol)
+
+    def _read_meta(self, symbol):
+        try:
+            with open(os.path.join(self._symbol_dir(symbol), "meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, symbol, meta):
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        path = os.path.join(self._symbol_dir(symbol), "meta.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _columns(self, symbol):
+        meta = self._read_meta(symbol)
+        if not meta or meta.get("generation") is None:
+            return None
+
+        cached = self._maps.get(symbol)
+        if cached and cached[0] == meta["generation"]:
+            return cached[1]
+
+        gen_dir = os.path.join(self._symbol_dir(symbol), f"g{meta['generation']}")
+        columns = {
+            name: np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode="r")
+            for name in ["date"] + COLUMNS
+        }
+        self._maps[symbol] = (meta["generation"], columns)
+        return columns
+
+    def last_date(self, symbol):
+        meta = self._read_meta(symbol)
+        return np.datetime64(meta["last_date"]) if meta and meta.get("last_date") else None
+
+    def load(self, symbol, start=None, end=None, columns=("Close",)):
+        data = self._columns(symbol)
+        if data is None:
+            return None
+
+        dates = data["date"]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, "D"), side="right"))
+
+        window = {"date": np.array(dates[lo:hi])}
+        for name in columns:
+            window[name] = np.array(data[name][lo:hi])
+        return window
+
+    def _fetch(self, symbol, start, end):
+        # ✅ 무거운 라이브러리라 실제로 받아올 때만 로드
+        import pandas as pd
+        import FinanceDataReader as fdr
+
+        df = market_data.guarded_call("fdr", fdr.DataReader, symbol, start, end)
+        if df is None or df.empty:
+            return None
+        df.index = pd.to_datetime(df.index)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        df = df.dropna(subset=["Close"])
+        return df
+
+    def sync(self, symbol, force=False):
+        with self._lock(symbol):
+            meta = self._read_meta(symbol) or {}
+            if not force and time.time() - meta.get("last_sync", 0) < self.sync_interval:
+                return False
+
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            existing = self._columns(symbol)
+            last = meta.get("last_date")
+
+            # ✅ 마지막 저장일부터 다시 받아 장중 미완성 봉을 덮어씀
+            start = datetime.strptime(last, "%Y-%m-%d") if last else today - timedelta(days=HISTORY_DAYS)
+            df = self._fetch(symbol, start, today)
+
+            if df is not None:
+                new_dates = df.index.values.astype("datetime64[D]")
+                merged = {"date": new_dates}
+                for name in COLUMNS:
+                    merged[name] = df[name].to_numpy(dtype="float64") if name in df else np.full(len(df), np.nan)
+
+                if existing is not None:
+                    keep = int(np.searchsorted(existing["date"], new_dates[0], side="left"))
+                    for name in merged:
+                        merged[name] = np.concatenate([np.asarray(existing[name][:keep]), merged[name]])
+
+                self._write_generation(symbol, meta, merged)
+
+            meta["last_sync"] = time.time()
+            self._write_meta(symbol, meta)
+            return df is not None
+
+    def _write_generation(self, symbol, meta, columns):
+        symbol_dir = self._symbol_dir(symbol)
+        generation = meta.get("generation", -1) + 1
+        gen_dir = os.path.join(symbol_dir, f"g{generation}")
+        os.makedirs(gen_dir, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(gen_dir, f"{name}.npy"), values)
+
+        previous = meta.get("generation")
+        meta.update({
+            "generation": generation,
+            "rows": int(len(columns["date"])),
+            "first_date": str(columns["date"][0]),
+            "last_date": str(columns["date"][-1]),
+        })
+        # ✅ meta.json 교체가 곧 커밋 (읽는 쪽은 항상 완성된 세대만 봄)
+        self._write_meta(symbol, meta)
+
+        if previous is not None:
+            shutil.rmtree(os.path.join(symbol_dir, f"g{previous}"), ignore_errors=True)
+
+    def refresh(self, symbol):
+        meta = self._read_meta(symbol) or {}
+        age = time.time() - meta.get("last_sync", 0)
+        if age < self.sync_interval:
+            market_data.upstream_stats.record("fdr", "hits")
+            return False
+        if meta.get("generation") is not None and age < self.stale_seconds:
+            # ✅ 저장된 일봉으로 먼저 응답하고 동기화는 백그라운드에서
+            market_data.upstream_stats.record("fdr", "stale")
+            market_data.revalidate("fdr", ("sync", symbol), self.sync, symbol)
+            return False
+        market_data.upstream_stats.record("fdr", "misses")
+        return self.sync(symbol)
+
+
+price_store = PriceStore()
@@ -0,0 +1,127 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+import market_data
+import timeseries
+
+# ✅ 티커당 상류 조회 최소 간격(초) / 최근 조회된 티커로 보는 시간(초)
+QUOTE_POLL_SECONDS = int(os.getenv("QUOTE_POLL_SECONDS", "300"))
+ACTIVE_TTL_SECONDS = int(os.getenv("QUOTE_ACTIVE_TTL_SECONDS", "900"))
+POLL_TICK_SECONDS = 5
+
+# ✅ 5분봉 링버퍼 크기 (정규장 하루 78개 + 여유)
+INTRADAY_BARS = 96
+
+
+class TickerQuotes:
+    def __init__(self):
+        self.bars = deque(maxlen=INTRADAY_BARS)
+        self.latest = None
+        self.fetched_at = 0.0
+        self.viewed_at = time.monotonic()
+
+    def intraday(self, columnar=False):
+        return timeseries.serialize_series([ts for ts, _ in self.bars], [p for _, p in self.bars], columnar)
+
+    def merge_bars(self, df):
+        fetched = [
+            (dt.strftime('%Y-%m-%d %H:%M'), float(close))
+            for dt, close in zip(df.index, df["Close"]) if not math.isnan(close)
+        ]
+        if not fetched:
+            return
+
+        # ✅ 날짜가 바뀌면 버퍼 초기화, 아니면 마지막(미완성) 봉 이후만 추가
+        if self.bars and self.bars[-1][0][:10] != fetched[-1][0][:10]:
+            self.bars.clear()
+        last_ts = self.bars.pop()[0] if self.bars else None
+        self.bars.extend(bar for bar in fetched if last_ts is None or bar[0] >= last_ts)
+
+
+class QuoteService:
+    def __init__(self, poll_interval=QUOTE_POLL_SECONDS, active_ttl=ACTIVE_TTL_SECONDS):
+        self.poll_interval = poll_interval
+        self.active_ttl = active_ttl
+        self._entries = {}
+        self._inflight = {}
+        self._task = None
+
+    def _is_fresh(self, entry):
+        return entry is not None and time.monotonic() - entry.fetched_at < self.poll_interval
+
+    async def get(self, ticker):
+        entry = self._entries.get(ticker)
+        if entry is not None:
+            entry.viewed_at = time.monotonic()
+        if self._is_fresh(entry):
+            return entry
+        return await self._refresh(ticker)
+
+    def _refresh(self, ticker, poll=False):
+        # ✅ 같은 티커의 동시 미스는 진행 중인 조회 하나를 함께 기다림 (singleflight)
+        task = self._inflight.get(ticker)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(ticker, poll))
+            self._inflight[ticker] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ticker, None))
+        return asyncio.shield(task)
+
+    async def _fetch(self, ticker, poll=False):
+        # ✅ 주기 폴링은 상류 캐시를 건너뛰고 새로 받음 (요청 경로만 캐시의 이전 값을 먼저 사용)
+        intraday, daily = await asyncio.gather(
+            market_data.run_upstream(market_data.fetch_intraday, ticker, poll),
+            market_data.run_upstream(market_data.fetch_recent_daily, ticker, "2d", poll),
+            return_exceptions=True,
+        )
+
+        entry = self._entries.get(ticker)
+        if isinstance(intraday, Exception) and isinstance(daily, Exception) and entry is None:
+            raise intraday
+
+        if entry is None:
+            entry = self._entries[ticker] = TickerQuotes()
+
+        if isinstance(intraday, Exception):
+            print(f"[1일 yfinance 처리 오류] {ticker}: {intraday}")
+        else:
+            entry.merge_bars(intraday)
+
+        if isinstance(daily, Exception):
+            print(f"[latest 시세 처리 오류] {ticker}: {daily}")
+        else:
+            entry.latest = market_data.build_latest_quote(daily)
+
+        entry.fetched_at = time.monotonic()
+        return entry
+
+    async def _poll_loop(self):
+        while True:
+            await asyncio.sleep(POLL_TICK_SECONDS)
+            now = time.monotonic()
+
+            # ✅ 오래 조회되지 않은 티커는 정리, 최근 조회된 티커만 주기적으로 갱신
+            for ticker, entry in list(self._entries.items()):
+                if now - entry.viewed_at > self.active_ttl * 4:
+                    del self._entries[ticker]
+
+            due = [
+                ticker for ticker, entry in self._entries.items()
+                if now - entry.viewed_at <= self.active_ttl and not self._is_fresh(entry)
+            ]
+            if due:
+                await asyncio.gather(*(self._refresh(t, poll=True) for t in due), return_exceptions=True)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._poll_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+quote_service = QuoteService()
@@ -0,0 +1,137 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from price_store import price_store
+
+# ✅ 시장 지수(FDR 심볼) / 무위험 수익률(연율) / 주기별 연간 관측 수
+MARKET_SYMBOL = os.getenv("RISK_MARKET_SYMBOL", "KS11")
+RISK_FREE_RATE = float(os.getenv("RISK_FREE_RATE", "0.03"))
+PERIODS_PER_YEAR = {"D": 252, "W": 52, "M": 12}
+DEFAULT_WINDOW_DAYS = 365
+CACHE_SIZE = 512
+
+
+def resample(dates, closes, freq):
+    # ✅ 주/월 단위는 구간 마지막 종가만 사용
+    if freq == "D" or len(dates) == 0:
+        return dates, closes
+    if freq == "W":
+        # 1970-01-01 이 목요일이므로 +3 일 하면 월요일 시작 주 번호
+        keys = (dates.astype("int64") + 3) // 7
+    else:
+        keys = dates.astype("datetime64[M]").astype("int64")
+    last = np.flatnonzero(np.r_[keys[1:] != keys[:-1], True])
+    return dates[last], closes[last]
+
+
+def max_drawdown(closes):
+    peaks = np.maximum.accumulate(closes)
+    return float((closes / peaks - 1).min())
+
+
+def resolve_window(start, end, last_date):
+    end = np.datetime64(end, "D") if end else last_date
+    start = np.datetime64(start, "D") if start else end - np.timedelta64(DEFAULT_WINDOW_DAYS, "D")
+    return start, end
+
+
+def _window(symbol, start, end):
+    data = price_store.load(symbol, start, end)
+    if data is None:
+        return None
+    valid = ~np.isnan(data["Close"])
+    return data["date"][valid], data["Close"][valid]
+
+
+def window_return(symbol, start, end):
+    window = _window(symbol, start, end)
+    if window is None or len(window[1]) < 2:
+        return None
+    closes = window[1]
+    return float(closes[-1] / closes[0] - 1)
+
+
+def _pct(value, digits=2):
+    return None if value is None or not math.isfinite(value) else round(value * 100, digits)
+
+
+def compute_risk(symbol, peer_symbols, start=None, end=None, freq="D"):
+    last_date = price_store.last_date(symbol)
+    if last_date is None:
+        return None
+    start, end = resolve_window(start, end, last_date)
+
+    window = _window(symbol, start, end)
+    if window is None:
+        return None
+    daily_dates, daily_closes = window
+    dates, closes = resample(daily_dates, daily_closes, freq)
+    if len(closes) < 3:
+        return None
+
+    # ✅ 기간 수익률은 일봉 기준 (시장·업종 수익률과 같은 구간)
+    total_return = float(daily_closes[-1] / daily_closes[0] - 1)
+    years = (daily_dates[-1] - daily_dates[0]).astype("int64") / 365.25
+    annualized = (1 + total_return) ** (1 / years) - 1 if years > 0 and total_return > -1 else None
+
+    # ✅ 변동성·샤프·MDD 는 선택한 주기의 수익률로 (벡터 연산)
+    periods = PERIODS_PER_YEAR[freq]
+    returns = closes[1:] / closes[:-1] - 1
+    std = float(returns.std(ddof=1))
+    volatility = std * math.sqrt(periods)
+    sharpe = (float(returns.mean()) - RISK_FREE_RATE / periods) / std * math.sqrt(periods) if std > 0 else None
+
+    # ✅ 시장 대비 / 업종(동일가중, 같은 기간 보유 수익률 평균) 대비 초과수익
+    market_return = window_return(MARKET_SYMBOL, start, end)
+    peer_returns = [r for r in (window_return(p, start, end) for p in peer_symbols) if r is not None]
+    sector_return = (sum(peer_returns) + total_return) / (len(peer_returns) + 1) if peer_returns else None
+
+    return {
+        "start": str(daily_dates[0]),
+        "end": str(daily_dates[-1]),
+        "freq": freq,
+        "observations": int(len(closes)),
+        "return": _pct(total_return),
+        "annualized_return": _pct(annualized),
+        "volatility": _pct(volatility),
+        "sharpe": None if sharpe is None else round(sharpe, 4),
+        "mdd": _pct(max_drawdown(closes)),
+        "market": {"symbol": MARKET_SYMBOL, "return": _pct(market_return)},
+        "excess_vs_market": None if market_return is None else _pct(total_return - market_return),
+        "sector": {"members": len(peer_returns) + 1, "return": _pct(sector_return)},
+        "excess_vs_sector": None if sector_return is None else _pct(total_return - sector_return),
+    }
+
+
+# ✅ (티커, 기간, 주기, 종목·시장·업종 마지막 봉 날짜) 별 결과 메모 → 새 봉이 들어오면 자동으로 다시 계산
+class RiskCache:
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol, peer_symbols, start=None, end=None, freq="D"):
+        # ✅ 업종 종목의 마지막 봉(없으면 None)도 키에 포함 → 늦게 동기화된 종목이 생기면 다시 계산
+        key = (
+            symbol, start, end, freq,
+            str(price_store.last_date(symbol)), str(price_store.last_date(MARKET_SYMBOL)),
+            tuple((peer, str(price_store.last_date(peer))) for peer in peer_symbols),
+        )
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        result = compute_risk(symbol, peer_symbols, start, end, freq)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+
+risk_cache = RiskCache()
@@ -0,0 +1,204 @@
+import numpy as np
+
+from database import db
+from snapshots import VersionedSnapshot
+
+SOURCE_COLLECTIONS = ("finacial_statement", "stock_price", "ESG_rate")
+
+GRADE_MAP = {"S": 7, "A+": 6, "A": 5, "B+": 4, "B": 3, "C": 2, "D": 1}
+FOCUS_MIN_SCORE = 5
+
+
+def _to_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    return float(value)
+
+
+# ✅ 재무 행(회사×연도) 단위로 재무·밸류에이션·ESG 를 열 배열로 합쳐 둔 스냅샷
+class ScreeningSnapshot:
+    def __init__(self, fin_rows, stock_docs, esg_docs):
+        n = len(fin_rows)
+        self.size = n
+        self.records = []
+
+        def column(rows, key):
+            return np.fromiter((_to_float(r.get(key)) for r in rows), dtype="float64", count=n)
+
+        self.roe = column(fin_rows, "ROE(%)")
+        self.eps = column(fin_rows, "EPS(기본)")
+        self.debt = column(fin_rows, "부채비율")
+        self.equity = column(fin_rows, "자기자본비율")
+        self.eps_present = np.fromiter((r.get("EPS(기본)") is not None for r in fin_rows), dtype=bool, count=n)
+
+        stocks = [stock_docs.get(r["회사명"]) for r in fin_rows]
+        self.has_stock = np.fromiter((s is not None for s in stocks), dtype=bool, count=n)
+        stock_values = [s or {} for s in stocks]
+        self.per = column(stock_values, "PER")
+        self.pbr = column(stock_values, "PBR")
+        self.dividend = column(stock_values, "배당수익률(%)")
+        self.per_present = np.fromiter((s.get("PER") is not None for s in stock_values), dtype=bool, count=n)
+        self.pbr_present = np.fromiter((s.get("PBR") is not None for s in stock_values), dtype=bool, count=n)
+        self.dividend_present = np.fromiter((s.get("배당수익률(%)") is not None for s in stock_values), dtype=bool, count=n)
+
+        esgs = [esg_docs.get(r["회사명"]) for r in fin_rows]
+        self.esg_total = np.fromiter(
+            (GRADE_MAP.get(str(e.get("종합등급", "N/A")).strip(), 0) if e else 0 for e in esgs),
+            dtype=np.int8, count=n,
+        )
+        self.esg_env = np.fromiter((GRADE_MAP.get(e.get("환경", ""), 0) if e else 0 for e in esgs), dtype=np.int8, count=n)
+        self.esg_soc = np.fromiter((GRADE_MAP.get(e.get("사회", ""), 0) if e else 0 for e in esgs), dtype=np.int8, count=n)
+        self.esg_gov = np.fromiter((GRADE_MAP.get(e.get("지배구조", ""), 0) if e else 0 for e in esgs), dtype=np.int8, count=n)
+
+        # ✅ 응답용 레코드 (기존 /recommend 응답 형식 그대로)
+        for row, stock, esg in zip(fin_rows, stocks, esgs):
+            record = {k: v for k, v in row.items() if k != "연도"}
+            if stock is not None:
+                record["PER"] = stock.get("PER")
+                record["PBR"] = stock.get("PBR")
+                record["배당수익률(%)"] = stock.get("배당수익률(%)")
+            if esg:
+                record["ESG등급"] = esg.get("종합등급", "N/A")
+                record["ESG_환경"] = esg.get("환경", "-")
+                record["ESG_사회"] = esg.get("사회", "-")
+                record["ESG_지배구조"] = esg.get("지배구조", "-")
+            else:
+                record["ESG등급"] = "N/A"
+                record["ESG_환경"] = "-"
+                record["ESG_사회"] = "-"
+                record["ESG_지배구조"] = "-"
+            self.records.append(record)
+
+    def screen(
+        self,
+        roe_min=0,
+        esg=None,
+        debt_max=None,
+        equity_ratio_min=None,
+        eps_positive=False,
+        allow_negative_eps=False,
+        per_max=None,
+        pbr_max=None,
+        dividend_min=None,
+        env_focus=False,
+        soc_focus=False,
+        gov_focus=False,
+    ):
+        mask = np.ones(self.size, dtype=bool)
+
+        # 1️⃣ 재무 조건
+        if roe_min:
+            mask &= self.roe >= roe_min
+        if debt_max:
+            mask &= self.debt <= debt_max
+        if equity_ratio_min:
+            mask &= self.equity >= equity_ratio_min
+        if eps_positive:
+            mask &= self.eps > 0
+        elif not allow_negative_eps:
+            mask &= self.eps_present
+
+        # 2️⃣ PER/PBR/배당 조건 (stock_price 문서가 없는 기업은 통과)
+        if per_max is not None:
+            mask &= ~self.has_stock | (self.per_present & ~(self.per > per_max))
+        if pbr_max is not None:
+            mask &= ~self.has_stock | (self.pbr_present & ~(self.pbr > pbr_max))
+        if dividend_min is not None:
+            mask &= ~self.has_stock | (self.dividend_present & ~(self.dividend < dividend_min))
+
+        # 3️⃣ ESG 조건
+        if esg:
+            mask &= self.esg_total >= GRADE_MAP.get(str(esg).strip(), 0)
+        if env_focus:
+            mask &= self.esg_env >= FOCUS_MIN_SCORE
+        if soc_focus:
+            mask &= self.esg_soc >= FOCUS_MIN_SCORE
+        if gov_focus:
+            mask &= self.esg_gov >= FOCUS_MIN_SCORE
+
+        return np.flatnonzero(mask)
+
+
+    # ✅ 정렬 기준 → (값 배열, 기본 정렬 방향)
+    def sort_key(self, sort_by, matched):
+        columns = {
+            "ROE": (self.roe, "desc"),
+            "EPS": (self.eps, "desc"),
+            "부채비율": (self.debt, "asc"),
+            "자기자본비율": (self.equity, "desc"),
+            "PER": (self.per, "asc"),
+            "PBR": (self.pbr, "asc"),
+            "배당수익률": (self.dividend, "desc"),
+            "ESG": (self.esg_total.astype("float64"), "desc"),
+        }
+        if sort_by == "score":
+            return self.composite_score(matched), "desc"
+        if sort_by not in columns:
+            return None, None
+        values, default_order = columns[sort_by]
+        return values[matched], default_order
+
+    def composite_score(self, matched):
+        # ✅ 조건 통과 기업 안에서의 백분위 평균 (높을수록 좋음, 값 없는 지표는 제외)
+        parts = [
+            (self.roe, True), (self.debt, False), (self.per, False),
+            (self.pbr, False), (self.dividend, True), (self.esg_total.astype("float64"), True),
+        ]
+        ranks = np.full((len(parts), len(matched)), np.nan)
+        for i, (values, higher_is_better) in enumerate(parts):
+            v = values[matched]
+            valid = ~np.isnan(v)
+            count = int(valid.sum())
+            if count == 0:
+                continue
+            order = np.argsort(np.argsort(v[valid] if higher_is_better else -v[valid], kind="stable"), kind="stable")
+            ranks[i, valid] = order / (count - 1) if count > 1 else 1.0
+
+        with np.errstate(all="ignore"):
+            counts = (~np.isnan(ranks)).sum(axis=0)
+            return np.where(counts > 0, np.nansum(ranks, axis=0) / np.maximum(counts, 1), np.nan)
+
+
+# ✅ 전체 정렬 대신 argpartition 으로 상위 offset+limit 개만 골라 정렬
+def top_k(values, order, offset, limit):
+    n = len(values)
+    key = -values if order == "desc" else values.copy()
+    key[np.isnan(key)] = np.inf
+
+    k = n if limit is None else min(n, offset + limit)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k == n:
+        candidates = np.arange(n)
+    else:
+        # ✅ k 번째 값과 같은 동점은 인덱스 순으로 채워야 페이지 사이 중복·누락이 없음
+        kth = key[np.argpartition(key, k - 1)[k - 1]]
+        below = np.flatnonzero(key < kth)
+        ties = np.flatnonzero(key == kth)[:k - len(below)]
+        candidates = np.concatenate([below, ties])
+    ordered = candidates[np.lexsort((candidates, key[candidates]))]
+    return ordered[offset:k]
+
+
+def _first_by_company(cursor):
+    docs = {}
+    for doc in cursor:
+        docs.setdefault(doc.get("회사명"), doc)
+    return docs
+
+
+def build_snapshot():
+    fin_rows = list(db.finacial_statement.find(
+        {},
+        {"_id": 0, "회사명": 1, "연도": 1, "ROE(%)": 1, "EPS(기본)": 1, "부채비율": 1, "자기자본비율": 1}
+    ))
+    stock_docs = _first_by_company(db.stock_price.find(
+        {}, {"_id": 0, "회사명": 1, "PER": 1, "PBR": 1, "배당수익률(%)": 1}
+    ))
+    esg_docs = _first_by_company(db.ESG_rate.find(
+        {}, {"_id": 0, "회사명": 1, "종합등급": 1, "환경": 1, "사회": 1, "지배구조": 1}
+    ))
+    return ScreeningSnapshot([r for r in fin_rows if r.get("회사명")], stock_docs, esg_docs)
+
+
+screening_engine = VersionedSnapshot("screener", SOURCE_COLLECTIONS, build_snapshot)
@@ -0,0 +1,140 @@
+import bisect
+from collections import defaultdict
+
+# ✅ 회사명/티커/초성 자동완성용 메모리 인덱스
+CHOSUNG = [
+    "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ", "ㅅ",
+    "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
+]
+CHOSUNG_SET = set(CHOSUNG)
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+
+# ✅ 정확히 일치 > 접두어 > 부분 문자열 > (오타 보정) 유사 순으로 정렬
+EXACT, PREFIX, SUBSTRING, SIMILAR = range(4)
+
+
+def normalize(text):
+    return "".join(str(text).split()).lower()
+
+
+def to_chosung(text):
+    result = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_START <= code <= HANGUL_END:
+            result.append(CHOSUNG[(code - HANGUL_START) // 588])
+        else:
+            result.append(ch)
+    return "".join(result)
+
+
+def is_chosung_query(text):
+    return bool(text) and all(ch in CHOSUNG_SET for ch in text)
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class SearchIndex:
+    def __init__(self, ticker_map=None):
+        self.build(ticker_map or {})
+
+    def build(self, ticker_map):
+        names = sorted(ticker_map)
+        tickers = [ticker_map[name] for name in names]
+        keys = [normalize(name) for name in names]
+        chosung = [to_chosung(key) for key in keys]
+
+        # ✅ 접두어 검색: 정렬된 (키, 번호) 배열 + 이진 탐색
+        prefix_keys = []
+        for i, key in enumerate(keys):
+            prefix_keys.append((key, i))
+            prefix_keys.append((chosung[i], i))
+            if tickers[i]:
+                prefix_keys.append((tickers[i].split(".")[0].lower(), i))
+        prefix_keys.sort()
+
+        # ✅ 부분 문자열 검색: 1·2-gram → 회사 번호
+        grams = defaultdict(set)
+        for i in range(len(names)):
+            for text in (keys[i], chosung[i]):
+                for n in (1, 2):
+                    for gram in _grams(text, n):
+                        grams[gram].add(i)
+
+        self.names, self.tickers, self.keys, self.chosung = names, tickers, keys, chosung
+        self.prefix_keys = prefix_keys
+        self.grams = grams
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_matches(self, query):
+        lo = bisect.bisect_left(self.prefix_keys, (query,))
+        matches = set()
+        for key, i in self.prefix_keys[lo:]:
+            if not key.startswith(query):
+                break
+            matches.add(i)
+        return matches
+
+    def _candidates(self, query):
+        grams = _grams(query, 2) or {query}
+        postings = [self.grams.get(gram, set()) for gram in grams]
+        return set.intersection(*postings) if postings else set()
+
+    def _similar(self, query, exclude):
+        # ✅ 회사명·초성 2-gram 이 많이 겹치는 회사 (오타 대비)
+        query_grams = _grams(query, 2)
+        chosung_grams = _grams(to_chosung(query), 2)
+        if not query_grams:
+            return []
+
+        candidates = set()
+        for gram in query_grams | chosung_grams:
+            candidates |= self.grams.get(gram, set())
+
+        scored = []
+        for i in candidates - exclude:
+            score = (
+                _jaccard(query_grams, _grams(self.keys[i], 2))
+                + _jaccard(chosung_grams, _grams(self.chosung[i], 2))
+            )
+            if score >= 0.5:
+                scored.append((-score, self.names[i], i))
+        return [i for *_, i in sorted(scored)]
+
+    def search(self, query, limit=10, fuzzy=False):
+        query = normalize(query)
+        if not query:
+            return []
+
+        field = self.chosung if is_chosung_query(query) else self.keys
+        ranked = []
+        for i in self._prefix_matches(query):
+            rank = EXACT if self.keys[i] == query else PREFIX
+            ranked.append((rank, len(self.names[i]), self.names[i], i))
+
+        seen = {i for *_, i in ranked}
+        for i in self._candidates(query) - seen:
+            if query in field[i]:
+                ranked.append((SUBSTRING, len(self.names[i]), self.names[i], i))
+                seen.add(i)
+
+        ranked.sort()
+        results = [i for *_, i in ranked[:limit]]
+        if fuzzy and len(results) < limit:
+            results += self._similar(query, seen)[:limit - len(results)]
+
+        return [{"회사명": self.names[i], "ticker": self.tickers[i]} for i in results]
+
+    def suggest(self, query, limit=5):
+        return [item["회사명"] for item in self.search(query, limit, fuzzy=True)]
+
+
+company_search = SearchIndex()
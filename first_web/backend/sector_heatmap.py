@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from company_directory import directory
+from price_store import price_store
+
+# ✅ 기간별 히트맵 재계산 주기(초)
+HEATMAP_TTL_SECONDS = 600
+# ✅ 업종 구성 종목 중 로컬 일봉이 있는 비율이 이보다 낮으면 히트맵에서 제외 (일부 종목으로 치우친 수익률 방지)
+MIN_COVERAGE = float(os.getenv("HEATMAP_MIN_COVERAGE", "0.5"))
+WEIGHTINGS = ("equal", "cap")
+
+
+def _member_window(symbol, days):
+    # ✅ 종목별 마지막 저장일 기준 기간 수익률 + 평균 거래대금(시가총액 가중 대용)
+    last_date = price_store.last_date(symbol)
+    if last_date is None:
+        return None
+    data = price_store.load(symbol, last_date - np.timedelta64(days, "D"), last_date, columns=("Close", "Volume"))
+    if data is None:
+        return None
+
+    valid = ~np.isnan(data["Close"])
+    closes, volumes = data["Close"][valid], data["Volume"][valid]
+    if len(closes) < 2 or closes[0] <= 0:
+        return None
+    return closes[-1] / closes[0] - 1, np.nanmean(closes * volumes)
+
+
+def _round_pct(values):
+    return [None if not np.isfinite(v) else round(float(v) * 100, 2) for v in values]
+
+
+def build_heatmap(tickers, days):
+    industries = directory.industries(wait=True)
+
+    names, groups, returns, weights = [], [], [], []
+    for gics_code, companies in industries.items():
+        for name in companies:
+            ticker = tickers.get(name)
+            window = _member_window(ticker.replace(".KS", ""), days) if ticker else None
+            if window is None:
+                continue
+            names.append(name)
+            groups.append(gics_code)
+            returns.append(window[0])
+            weights.append(window[1])
+
+    if not names:
+        return {weighting: [] for weighting in WEIGHTINGS}
+
+    # ✅ 업종별 집계는 정수 그룹 번호 + bincount 로 한 번에
+    codes, idx = np.unique(np.array(groups), return_inverse=True)
+    returns = np.array(returns, dtype="float64")
+    weights = np.nan_to_num(np.array(weights, dtype="float64"), nan=0.0)
+
+    counts = np.bincount(idx, minlength=len(codes))
+    equal = np.bincount(idx, weights=returns, minlength=len(codes)) / counts
+    weight_sums = np.bincount(idx, weights=weights, minlength=len(codes))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cap = np.bincount(idx, weights=returns * weights, minlength=len(codes)) / weight_sums
+    # 거래대금이 모두 0 인 업종은 동일가중으로 대체
+    cap = np.where(weight_sums > 0, cap, equal)
+
+    # ✅ 업종 안에서 수익률 순 정렬 → 그룹 경계의 처음/끝이 최저/최고 종목
+    order = np.lexsort((returns, idx))
+    bounds = np.r_[0, np.cumsum(counts)]
+    worst = order[bounds[:-1]]
+    best = order[bounds[1:] - 1]
+
+    base = []
+    for i, gics_code in enumerate(codes.tolist()):
+        total = len(industries.get(gics_code, []))
+        coverage = counts[i] / total if total else 0.0
+        if coverage < MIN_COVERAGE:
+            continue
+        profile = directory.get(names[best[i]]) or {}
+        base.append({
+            "GICS_4자리": gics_code,
+            "업종명": profile.get("업종명"),
+            "members": int(counts[i]),
+            "total_members": total,
+            "coverage": round(float(coverage), 4),
+            "best": {"company_name": names[best[i]], "return": _round_pct([returns[best[i]]])[0]},
+            "worst": {"company_name": names[worst[i]], "return": _round_pct([returns[worst[i]]])[0]},
+        })
+
+    heatmap = {}
+    for weighting, values in (("equal", equal), ("cap", cap)):
+        pcts = dict(zip(codes.tolist(), _round_pct(values)))
+        rows = [{**row, "return": pcts[row["GICS_4자리"]]} for row in base]
+        heatmap[weighting] = sorted(rows, key=lambda r: -np.inf if r["return"] is None else r["return"], reverse=True)
+    return heatmap
+
+
+# ✅ 기간별 (동일가중·거래대금 가중) 결과를 함께 캐시
+class HeatmapCache:
+    def __init__(self, ttl=HEATMAP_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, period, days, tickers, weighting):
+        entry = self._entries.get(period)
+        if entry is None or time.monotonic() - entry["built_at"] >= self.ttl:
+            with self._lock:
+                entry = self._entries.get(period)
+                if entry is None or time.monotonic() - entry["built_at"] >= self.ttl:
+                    started = time.monotonic()
+                    entry = {
+                        "built_at": time.monotonic(),
+                        "as_of": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "heatmap": build_heatmap(tickers, days),
+                    }
+                    self._entries[period] = entry
+                    print(f"✅ [sector_heatmap] {period} 갱신 ({time.monotonic() - started:.2f}s)")
+
+        return {"as_of": entry["as_of"], "sectors": entry["heatmap"][weighting]}
+
+
+heatmap_cache = HeatmapCache()
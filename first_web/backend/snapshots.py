@@ -0,0 +1,96 @@
+import threading
+import time
+
+from pymongo.errors import PyMongoError
+
+from database import collection_version
+
+# ✅ 전체 재적재 주기(초) / 버전(문서 수 + 변경 횟수) 확인 주기(초)
+# change stream 을 쓸 수 없는 배포에서는 문서 수가 그대로인 수정은 TTL 이 지나야 반영됨
+SNAPSHOT_TTL_SECONDS = 600
+VERSION_CHECK_SECONDS = 30
+
+
+# ✅ 원본 컬렉션이 바뀌거나 TTL 이 지나면 다시 만드는 메모리 스냅샷
+class VersionedSnapshot:
+    def __init__(self, name, sources, build, ttl=SNAPSHOT_TTL_SECONDS, check_interval=VERSION_CHECK_SECONDS):
+        self.name = name
+        self.sources = tuple(sources)
+        self.build = build
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.version = None
+        self.built_at = 0.0
+        self.checked_at = 0.0
+        self._value = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refreshing_lock = threading.Lock()
+
+    def _build_locked(self):
+        started = time.monotonic()
+        version = collection_version(*self.sources)
+        self._value = self.build()
+        self.version = version
+        self.built_at = self.checked_at = time.monotonic()
+        print(f"✅ [{self.name}] 스냅샷 갱신 ({time.monotonic() - started:.2f}s)")
+
+    def rebuild(self):
+        with self._lock:
+            self._build_locked()
+            return self._value
+
+    def peek(self):
+        # ✅ 갱신 확인 없이 현재 값만 (아직 없으면 None)
+        return self._value
+
+    def _refresh_if_stale(self, force=False):
+        try:
+            # ✅ 락을 잡은 뒤 다시 확인 → 기다리던 호출이 같은 스냅샷을 또 만들지 않음
+            with self._lock:
+                now = time.monotonic()
+                if force or self._value is None or now - self.built_at >= self.ttl:
+                    self._build_locked()
+                elif now - self.checked_at >= self.check_interval:
+                    self.checked_at = now
+                    if collection_version(*self.sources) != self.version:
+                        self._build_locked()
+        except PyMongoError as e:
+            # ✅ 갱신 실패 시 기존 스냅샷으로 계속 응답
+            print(f"⚠️ [{self.name}] 갱신 실패: {e}")
+
+    def _is_due(self):
+        now = time.monotonic()
+        return now - self.built_at >= self.ttl or now - self.checked_at >= self.check_interval
+
+    def get(self):
+        # ✅ 처음 한 번만 만들어질 때까지 기다리고, 이후 갱신은 백그라운드 스레드에서
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._build_locked()
+                return self._value
+        if self._is_due():
+            self.refresh_in_background()
+        return self._value
+
+    def refresh_in_background(self, force=False):
+        # ✅ 버전 확인·재적재는 스레드 하나에서만 (동시에 여러 번 돌지 않음)
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self._refresh_if_stale(force)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name=f"{self.name}-refresh", daemon=True).start()
+
+    def get_nowait(self):
+        # ✅ 이벤트 루프에서 쓰는 조회: DB 를 기다리지 않고 현재 값을 바로 반환 (없으면 None)
+        if self._value is None or self._is_due():
+            self.refresh_in_background()
+        return self._value
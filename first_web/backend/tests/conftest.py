@@ -0,0 +1,6 @@
+import os
+import sys
+
+# ✅ 모듈 import 시 클라이언트만 만들고 실제 연결은 하지 않음
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
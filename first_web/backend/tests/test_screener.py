@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from screener import top_k
+
+
+def _full_order(values, order):
+    key = -values if order == "desc" else values.copy()
+    key[np.isnan(key)] = np.inf
+    return np.lexsort((np.arange(len(values)), key))
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_top_k_pages_match_full_order_with_ties(order):
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 5, 200).astype("float64")
+    values[rng.random(200) < 0.5] = np.nan
+
+    full = _full_order(values, order)
+    pages = [top_k(values, order, offset, 10) for offset in range(0, 200, 10)]
+
+    for offset, page in zip(range(0, 200, 10), pages):
+        assert page.tolist() == full[offset:offset + 10].tolist()
+    assert len(set(np.concatenate(pages).tolist())) == 200
+
+
+def test_top_k_without_limit_returns_everything_from_offset():
+    values = np.array([3.0, np.nan, 1.0, 3.0, 2.0])
+    assert top_k(values, "asc", 0, None).tolist() == [2, 4, 0, 3, 1]
+    assert top_k(values, "desc", 1, None).tolist() == [3, 4, 2, 1]
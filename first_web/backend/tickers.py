@@ -0,0 +1,51 @@
+import json
+import os
+
+TICKER_SOURCE = "기업_리스트.xlsx"
+# ✅ 엑셀 파싱 결과 캐시 (엑셀 수정 시각·크기가 같으면 재사용)
+TICKER_CACHE = os.getenv("TICKER_CACHE_PATH", "ticker_map.cache.json")
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _read_excel(path):
+    import pandas as pd
+
+    df_codes = pd.read_excel(path)[['회사명', '종목코드']].dropna()
+    df_codes['종목코드'] = df_codes['종목코드'].astype(float).astype(int).astype(str).str.zfill(6)
+    df_codes['티커'] = df_codes['종목코드'] + ".KS"
+    return dict(zip(df_codes['회사명'], df_codes['티커']))
+
+
+def _read_cache(cache_path, stamp):
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(cached, dict) or cached.get("source") != stamp:
+        return None
+    return cached.get("tickers")
+
+
+def _write_cache(cache_path, stamp, tickers):
+    tmp = cache_path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"source": stamp, "tickers": tickers}, f, ensure_ascii=False)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"⚠️ [tickers] 캐시 저장 실패: {e}")
+
+
+# ✅ 회사명 → 야후 티커(000000.KS) 매핑
+def load_ticker_map(path=TICKER_SOURCE, cache_path=TICKER_CACHE):
+    stamp = _source_stamp(path)
+    tickers = _read_cache(cache_path, stamp)
+    if tickers is None:
+        tickers = _read_excel(path)
+        _write_cache(cache_path, stamp, tickers)
+    return tickers
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+# ✅ LTTB (Largest-Triangle-Three-Buckets): 모양을 유지하면서 threshold 개 점으로 축소
+def lttb_indices(x, y, threshold):
+    n = len(y)
+    if threshold is None or threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    bucket_size = (n - 2) / (threshold - 2)
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        range_start = int(i * bucket_size) + 1
+        range_end = int((i + 1) * bucket_size) + 1
+        avg_start = range_end
+        avg_end = min(int((i + 2) * bucket_size) + 1, n)
+
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[range_start:range_end] - y[a])
+            - (x[a] - x[range_start:range_end]) * (avg_y - y[a])
+        )
+        a = range_start + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def downsample(dates, values, max_points):
+    idx = lttb_indices(dates.astype("datetime64[D]").astype("int64"), values, max_points)
+    return dates[idx], values[idx]
+
+
+# ✅ rows: [{"date", "price"}] / columnar: {"dates": [...], "prices": [...]}
+def serialize_series(date_strings, prices, columnar=False):
+    if columnar:
+        return {"dates": date_strings, "prices": prices}
+    return [{"date": date, "price": price} for date, price in zip(date_strings, prices)]
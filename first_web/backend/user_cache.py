@@ -0,0 +1,26 @@
+import os
+
+from cachetools import TTLCache
+
+from database import async_db
+
+# ✅ 인증 요청마다 users 조회하지 않도록 사용자 문서 캐시 (짧은 TTL LRU)
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1024"))
+
+users_collection = async_db["users"]
+_users = TTLCache(maxsize=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+
+
+async def get_user(email):
+    user = _users.get(email)
+    if user is None:
+        user = await users_collection.find_one({"email": email})
+        if user:
+            _users[email] = user
+    return user
+
+
+# ✅ 사용자 문서를 바꾸는 쓰기(즐겨찾기 등) 후 호출
+def invalidate_user(email):
+    _users.pop(email, None)
@@ -121,29 +121,23 @@ function FinancialsPage() {
       try {
         const encoded = encodeURIComponent(companyName);
 
-        const [companyRes, ...avgResList] = await Promise.all([
+        // ✅ 업종 평균은 /averages 한 번으로 전체 지표 조회
+        const metricsQuery = charts.map(({ apiKey }) => `metrics=${encodeURIComponent(apiKey)}`).join("&");
+
+        const [companyRes, avgRes] = await Promise.all([
           axios.get(`http://localhost:8000/company/${encoded}/financials`),
-          ...charts.map(({ apiKey }) =>
-            axios
-              .get(`http://localhost:8000/average/${encodeURIComponent(apiKey)}/by-gics?company_name=${encoded}`)
-              .catch(() => null)
-          )
+          axios
+            .get(`http://localhost:8000/averages?company_name=${encoded}&${metricsQuery}`)
+            .catch(() => null)
         ]);
 
         const companyData = companyRes.data;
-        const avgMap = {};
-
-        charts.forEach(({ key, apiKey }, idx) => {
-          const res = avgResList[idx];
-          if (res && res.data) {
-            avgMap[apiKey] = res.data.data;
-        
-            // industryName 설정
-            if (!industryName && res.data.industry_name) {
-              setIndustryName(res.data.industry_name);
-            }
-          }
-        });
+        const avgMap = avgRes?.data?.data ?? {};
+
+        // industryName 설정
+        if (!industryName && avgRes?.data?.industry_name) {
+          setIndustryName(avgRes.data.industry_name);
+        }
 
         setFinancials(companyData);
         setAverages(avgMap);
@@ -192,27 +186,15 @@ function FinancialsPage() {
   useEffect(() => {
   const fetchSummaryPercentiles = async () => {
     const encoded = encodeURIComponent(companyName);
-    const categoriesToFetch = ["안정성", "수익성", "성장성"];
 
-    const results = await Promise.all(
-      categoriesToFetch.map((cat) =>
-        axios
-          .get(`http://localhost:8000/percentile-summary/${encodeURIComponent(cat)}/${encoded}`)
-          .then(res => {
-            console.log(`✅ ${cat} 응답:`, res.data); // 👈 확인 포인트
-            return { key: cat, data: res.data };
-          })
-          .catch((e) => {
-            console.warn(`❌ ${cat} 요약 퍼센타일 에러`, e);
-            return null;
-          })
-      )
-    );
-
-    const map = {};
-    results.forEach(r => {
-      if (r) map[r.key] = r.data;
-    });
+    // ✅ 안정성/수익성/성장성을 /scorecard 한 번으로 조회
+    const map = await axios
+      .get(`http://localhost:8000/scorecard/${encoded}`)
+      .then(res => res.data.categories)
+      .catch((e) => {
+        console.warn("❌ 요약 퍼센타일 에러", e);
+        return {};
+      });
 
     console.log("📊 요약 퍼센타일 map:", map); // 👈 확인 포인트
     setSummaryPercentiles(map);
@@ -3,8 +3,11 @@ import api from '../services/api'; // Axios 인스턴스 (토큰 자동 포함)
 import { useNavigate } from 'react-router-dom';
 import { DragDropContext, Droppable, Draggable } from 'react-beautiful-dnd';
 
+const formatValue = (value) => (typeof value === 'number' ? value.toFixed(1) : '-');
+
 function MyPage() {
   const [favorites, setFavorites] = useState([]);
+  const [summaries, setSummaries] = useState({});
   const [email, setEmail] = useState('');
   const [error, setError] = useState('');
   const navigate = useNavigate();
@@ -26,9 +29,11 @@ function MyPage() {
         const meRes = await api.get('/me');
         setEmail(meRes.data.email);
 
-        // 즐겨찾기 목록 가져오기
-        const favRes = await api.get('/favorites');
-        setFavorites(favRes.data);
+        // ✅ 즐겨찾기 목록 + 기업별 요약 (한 번에)
+        const dashRes = await api.get('/favorites/dashboard');
+        const items = dashRes.data.favorites;
+        setFavorites(items.map((item) => item.회사명));
+        setSummaries(Object.fromEntries(items.map((item) => [item.회사명, item])));
       } catch (err) {
         console.error('마이페이지 로딩 실패:', err);
         setError('로그인이 필요합니다.');
@@ -60,12 +65,22 @@ function MyPage() {
                   key={idx}
                   className="flex justify-between items-center px-4 py-2 rounded-lg bg-white border border-blue-200 shadow-sm hover:bg-blue-50 transition"
                 >
-                  <span
-                    className="text-blue-800 font-medium cursor-pointer hover:underline"
-                    onClick={() => navigate(`/company/${encodeURIComponent(company)}/financials`)}
-                  >
-                    {company}
-                  </span>
+                  <div>
+                    <span
+                      className="text-blue-800 font-medium cursor-pointer hover:underline"
+                      onClick={() => navigate(`/company/${encodeURIComponent(company)}/financials`)}
+                    >
+                      {company}
+                    </span>
+                    {summaries[company] && (
+                      <p className="text-xs text-gray-500">
+                        ROE {formatValue(summaries[company].financials?.["ROE(%)"])}
+                        {" · "}부채비율 {formatValue(summaries[company].financials?.부채비율)}
+                        {" · "}PER {formatValue(summaries[company].valuation?.PER)}
+                        {" · "}ESG {summaries[company].esg?.종합등급 ?? "-"}
+                      </p>
+                    )}
+                  </div>
                   <button
                     onClick={() => handleRemove(company)}
                     className="text-blue-500 hover:text-blue-700 text-sm font-semibold transition-colors duration-200"
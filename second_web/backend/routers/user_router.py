@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from bson import ObjectId
 from services.database import users_collection
-from services.jwt_utils import get_current_user
+from services.jwt_utils import get_current_user, load_user, invalidate_user
 from routers.models.survey_schema import SurveyData
 
 router = APIRouter()
@@ -14,13 +14,15 @@ def save_survey(data: SurveyData, user=Depends(get_current_user)):
         {"_id": ObjectId(user["id"])},
         {"$set": data.dict()}
     )
+    invalidate_user(user["id"])
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="사용자 정보 없음")
     return {"message": "설문 저장 완료"}
 
 @router.get("/profile")
 def get_profile(user=Depends(get_current_user)):
-    doc = users_collection.find_one({"_id": ObjectId(user["id"])})
+    # ✅ get_current_user 가 캐시한 문서 재사용 (추가 DB 조회 없음)
+    doc = load_user(user["id"])
     if not doc:
         raise HTTPException(status_code=404, detail="사용자 없음")
     return {
@@ -1,8 +1,10 @@
+import threading
 
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from bson import ObjectId
+from cachetools import TTLCache
 from services.database import users_collection
 
 SECRET_KEY = "eri1"
@@ -10,6 +12,29 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+# ✅ 사용자 문서 캐시 (인증 요청마다 DB 조회하지 않도록, 짧은 TTL)
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = TTLCache(maxsize=1024, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = threading.Lock()
+
+
+def load_user(user_id: str):
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
+    if user is None:
+        user = users_collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+        if user:
+            with _user_cache_lock:
+                _user_cache[user_id] = user
+    return user
+
+
+# ✅ 사용자 문서를 바꾸는 쓰기(설문 저장 등) 후 호출
+def invalidate_user(user_id: str):
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
 def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -19,11 +44,11 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise HTTPException(status_code=401, detail="유효하지 않은 토큰입니다")
 
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+    user = load_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자 없음")
     
     return {
         "id": str(user["_id"]),
         "email": user["email"]
-    }
\ No newline at end of file
+    }